@@ -0,0 +1,31 @@
+"""
+Response classes shared by the API routes
+"""
+
+from typing import Any
+import msgspec
+import orjson
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def model_response(model: BaseModel) -> Response:
+    """Serialize a trusted stored model directly, skipping response_model re-validation"""
+    return Response(content=model.model_dump_json(), media_type="application/json")
+
+
+# Shared encoder; msgspec.json.Encoder reuses its internal buffer across calls
+_encoder = msgspec.json.Encoder()
+
+
+def struct_response(struct: msgspec.Struct) -> Response:
+    """Encode a msgspec struct straight to JSON bytes"""
+    return Response(content=_encoder.encode(struct), media_type="application/json")
@@ -2,32 +2,43 @@
 Games API Routes - Handle game creation, moves, and state
 """
 
-from fastapi import APIRouter, HTTPException, Depends, WebSocket
+from fastapi import APIRouter, HTTPException, Depends, WebSocket, Response
 from typing import List, Optional, Dict, Any
+import itertools
 import logging
+import msgspec
+from pydantic import TypeAdapter
 
 from models.schemas import (
     GameState, GameCreate, GameJoin, Move, MoveResult,
-    Piece, CaptureData, EvolutionRequest, EvolutionOptions,
+    Piece, EvolutionRequest, EvolutionOptions,
     APIResponse, PaginatedResponse, Position,
 )
+from models.schemas_fast import GameState as GameRecord
+from services.connection_manager import connection_manager
+from api.responses import struct_response
+from services.locks import lock_for
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 # In-memory storage (would use database in production)
-games_db: Dict[int, GameState] = {}
-pieces_db: Dict[int, List[Piece]] = {}
-captures_db: Dict[int, CaptureData] = {}
+games_db: Dict[int, GameRecord] = {}
+pieces_db: Dict[int, List[Piece]] = {}  # At most 32 pieces per game
+
+# Game ID sequence; next() on itertools.count is atomic under the GIL
+_game_id_gen = itertools.count(1)
+
+_pieces_adapter = TypeAdapter(List[Piece])
 
 
 @router.post("/", response_model=APIResponse)
 async def create_game(game_data: GameCreate):
     """Create a new game"""
-    game_id = len(games_db) + 1
+    game_id = next(_game_id_gen)
     
-    game_state = GameState(
+    game_state = GameRecord(
         id=game_id,
         player_white=game_data.player_white,
         player_black=game_data.player_white,  # Until someone joins
@@ -40,12 +51,11 @@ async def create_game(game_data: GameCreate):
     games_db[game_id] = game_state
     pieces_db[game_id] = []
     
-    logger.info(f"Game created: {game_id} by {game_data.player_white}")
+    logger.info("Game created: %s by %s", game_id, game_data.player_white)
     
-    return APIResponse(
-        success=True,
+    return APIResponse.ok(
         message="Game created successfully",
-        data={"game_id": game_id, "game": game_state},
+        data={"game_id": game_id, "game": msgspec.to_builtins(game_state)},
     )
 
 
@@ -55,20 +65,26 @@ async def join_game(game_id: int, join_data: GameJoin):
     if game_id not in games_db:
         raise HTTPException(status_code=404, detail="Game not found")
     
-    game = games_db[game_id]
-    
-    if game.player_black != game.player_white:
-        raise HTTPException(status_code=400, detail="Game already full")
-    
-    game.player_black = join_data.player_black
-    game.status = "PLAYING"
-    
-    logger.info(f"Player {join_data.player_black} joined game {game_id}")
-    
-    return APIResponse(
-        success=True,
+    async with lock_for(game_id):
+        game = games_db[game_id]
+        
+        if game.player_black != game.player_white:
+            raise HTTPException(status_code=400, detail="Game already full")
+        
+        game.player_black = join_data.player_black
+        game.status = "PLAYING"
+        
+    logger.info("Player %s joined game %s", join_data.player_black, game_id)
+    
+    connection_manager.publish(game_id, {
+        "type": "player_joined",
+        "game_id": game_id,
+        "game": msgspec.to_builtins(game),
+    })
+    
+    return APIResponse.ok(
         message="Joined game successfully",
-        data={"game": game},
+        data={"game": msgspec.to_builtins(game)},
     )
 
 
@@ -78,7 +94,7 @@ async def get_game_state(game_id: int):
     if game_id not in games_db:
         raise HTTPException(status_code=404, detail="Game not found")
     
-    return games_db[game_id]
+    return struct_response(games_db[game_id])
 
 
 @router.post("/{game_id}/move", response_model=MoveResult)
@@ -87,34 +103,47 @@ async def make_move(game_id: int, move: Move):
     if game_id not in games_db:
         raise HTTPException(status_code=404, detail="Game not found")
     
-    game = games_db[game_id]
-    
-    # Validate turn
-    # In production, would verify signature
-    
-    # Check for capture
-    is_capture = False
-    captured_piece_id = None
-    
-    # Simulate move processing
-    # In production, would call smart contract
-    
-    game.move_count += 1
-    
-    # Switch turns
-    game.current_turn = game.player_black if game.current_turn == game.player_white else game.player_white
-    game.last_move_at = None  # Would be datetime.utcnow()
-    
+    async with lock_for(game_id):
+        game = games_db[game_id]
+        
+        # Validate turn
+        # In production, would verify signature
+        
+        # Check for capture
+        is_capture = False
+        captured_piece_id = None
+        
+        # Simulate move processing
+        # In production, would call smart contract
+        
+        game.move_count += 1
+        
+        # Switch turns
+        game.current_turn = game.player_black if game.current_turn == game.player_white else game.player_white
+        game.last_move_at = None  # Would be datetime.utcnow()
+        
     # Check for evolution
     evolution_pending = is_capture
     
-    return MoveResult(
+    # Fields come from the validated request, so skip re-validation
+    result = MoveResult.model_construct(
         success=True,
         is_capture=is_capture,
         captured_piece_id=captured_piece_id,
         new_position=move.to_pos,
         evolution_pending=evolution_pending,
     )
+    
+    connection_manager.publish(game_id, {
+        "type": "move",
+        "game_id": game_id,
+        "move": move.model_dump(by_alias=True),
+        "result": result.model_dump(),
+        "current_turn": game.current_turn,
+        "move_count": game.move_count,
+    })
+    
+    return result
 
 
 @router.get("/{game_id}/pieces", response_model=List[Piece])
@@ -123,7 +152,10 @@ async def get_game_pieces(game_id: int):
     if game_id not in games_db:
         raise HTTPException(status_code=404, detail="Game not found")
     
-    return pieces_db.get(game_id, [])
+    return Response(
+        content=_pieces_adapter.dump_json(pieces_db.get(game_id, [])),
+        media_type="application/json",
+    )
 
 
 @router.get("/{game_id}/valid-moves/{piece_id}", response_model=List[Position])
@@ -148,12 +180,15 @@ async def request_evolution(game_id: int, evolution: EvolutionRequest):
         raise HTTPException(status_code=404, detail="Game not found")
     
     # In production, would call smart contract
-    logger.info(f"Evolution requested in game {game_id}: piece {evolution.piece_id}")
+    logger.info("Evolution requested in game %s: piece %s", game_id, evolution.piece_id)
     
-    return APIResponse(
-        success=True,
-        message="Evolution applied successfully",
-    )
+    connection_manager.publish(game_id, {
+        "type": "evolution",
+        "game_id": game_id,
+        "evolution": evolution.model_dump(),
+    })
+    
+    return APIResponse.ok("Evolution applied successfully")
 
 
 @router.post("/{game_id}/evolution/skip", response_model=APIResponse)
@@ -162,12 +197,9 @@ async def skip_evolution(game_id: int, piece_id: int):
     if game_id not in games_db:
         raise HTTPException(status_code=404, detail="Game not found")
     
-    logger.info(f"Evolution skipped in game {game_id}: piece {piece_id}")
+    logger.info("Evolution skipped in game %s: piece %s", game_id, piece_id)
     
-    return APIResponse(
-        success=True,
-        message="Evolution skipped",
-    )
+    return APIResponse.ok("Evolution skipped")
 
 
 @router.post("/{game_id}/resign", response_model=APIResponse)
@@ -176,15 +208,22 @@ async def resign_game(game_id: int, player: str):
     if game_id not in games_db:
         raise HTTPException(status_code=404, detail="Game not found")
     
-    game = games_db[game_id]
-    game.winner = game.player_black if player == game.player_white else game.player_white
-    game.status = "COMPLETED"
-    game.is_checkmate = True
-    
-    logger.info(f"Player {player} resigned from game {game_id}")
-    
-    return APIResponse(
-        success=True,
+    async with lock_for(game_id):
+        game = games_db[game_id]
+        game.winner = game.player_black if player == game.player_white else game.player_white
+        game.status = "COMPLETED"
+        game.is_checkmate = True
+        
+    logger.info("Player %s resigned from game %s", player, game_id)
+    
+    connection_manager.publish(game_id, {
+        "type": "game_over",
+        "game_id": game_id,
+        "reason": "RESIGNATION",
+        "winner": game.winner,
+    })
+    
+    return APIResponse.ok(
         message="Game resigned",
         data={"winner": game.winner},
     )
@@ -196,16 +235,23 @@ async def offer_draw(game_id: int, player: str):
     if game_id not in games_db:
         raise HTTPException(status_code=404, detail="Game not found")
     
-    # In production, would track draw offers
-    game.status = "COMPLETED"
-    game.is_stalemate = True
-    
-    logger.info(f"Draw in game {game_id}")
-    
-    return APIResponse(
-        success=True,
-        message="Game ended in draw",
-    )
+    async with lock_for(game_id):
+        game = games_db[game_id]
+        
+        # In production, would track draw offers
+        game.status = "COMPLETED"
+        game.is_stalemate = True
+        
+    logger.info("Draw in game %s", game_id)
+    
+    connection_manager.publish(game_id, {
+        "type": "game_over",
+        "game_id": game_id,
+        "reason": "DRAW",
+        "winner": None,
+    })
+    
+    return APIResponse.ok("Game ended in draw")
 
 
 @router.get("/{game_id}/history", response_model=PaginatedResponse)
@@ -217,10 +263,11 @@ async def get_move_history(game_id: int, page: int = 1, page_size: int = 20):
     # In production, would query database
     moves = []
     
-    return PaginatedResponse(
-        items=moves,
-        total=len(moves),
-        page=page,
-        page_size=page_size,
-        has_more=False,
-    )
+    # Plain dict; response_model validates it once on the way out
+    return {
+        "items": moves,
+        "total": len(moves),
+        "page": page,
+        "page_size": page_size,
+        "has_more": False,
+    }
@@ -2,14 +2,18 @@
 Inventory API Routes - Handle piece inventory management
 """
 
-from fastapi import APIRouter, HTTPException
-from typing import List, Dict, Optional
+from fastapi import APIRouter, HTTPException, Response
+from typing import Callable, List, Dict, Optional, Tuple
+from collections import OrderedDict
+import itertools
 import logging
+import orjson
 
 from models.schemas import (
-    Inventory, InventoryPiece, Piece, Trait, TraitName,
-    PieceType, APIResponse,
+    Inventory, InventoryPiece, SavePieceRequest, APIResponse,
 )
+from api.responses import model_response
+from services.locks import lock_for
 
 logger = logging.getLogger(__name__)
 
@@ -18,64 +22,117 @@ router = APIRouter()
 # In-memory storage (would use database in production)
 inventory_db: Dict[str, Inventory] = {}
 
+# Inventory piece ID sequence, unique across all owners
+_piece_id_gen = itertools.count(1000)
+
+# Encoded responses per owner: owner -> (inventory version, bytes), LRU-bounded
+RESPONSE_CACHE_SIZE = 4096
+_inventory_cache: "OrderedDict[str, Tuple[int, bytes]]" = OrderedDict()
+_stats_cache: "OrderedDict[str, Tuple[int, bytes]]" = OrderedDict()
+
 
 def get_or_create_inventory(owner: str) -> Inventory:
     """Get existing inventory or create new one"""
-    if owner not in inventory_db:
-        inventory_db[owner] = Inventory(
+    inventory = inventory_db.get(owner)
+    if inventory is None:
+        inventory = inventory_db[owner] = Inventory(
             owner=owner,
             pieces=[],
             max_slots=10,
         )
-    return inventory_db[owner]
+    return inventory
+
+
+def _cached_response(
+    cache: "OrderedDict[str, Tuple[int, bytes]]",
+    inventory: Inventory,
+    encode: Callable[[], bytes],
+) -> Response:
+    """Serve the encoding cached for this inventory version, re-encoding after a mutation"""
+    owner = inventory.owner
+    entry = cache.get(owner)
+    if entry is not None and entry[0] == inventory._version:
+        content = entry[1]
+    else:
+        content = encode()
+        cache[owner] = (inventory._version, content)
+    
+    cache.move_to_end(owner)
+    if len(cache) > RESPONSE_CACHE_SIZE:
+        cache.popitem(last=False)
+    
+    return Response(content=content, media_type="application/json")
+
+
+def _find_piece(inventory: Inventory, piece_id: int) -> InventoryPiece:
+    """Look up a piece by id, raising 404 if missing"""
+    try:
+        return inventory.pieces[inventory._id_index[piece_id]]
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Piece not found")
+
+
+def _add_piece(inventory: Inventory, piece: InventoryPiece):
+    """Append a piece, index it by id and fold it into the aggregates"""
+    inventory._id_index[piece.id] = len(inventory.pieces)
+    inventory.pieces.append(piece)
+    inventory.used_slots = len(inventory.pieces)
+    
+    inventory._total_captures += piece.captures_made
+    inventory._total_evolutions += piece.evolution_count
+    inventory._rarity_counts[piece.rarity] += 1
+    inventory._locked_count += piece.is_locked
+
+
+def _remove_piece(inventory: Inventory, piece_id: int):
+    """Remove a piece by id, moving the last piece into its slot"""
+    i = inventory._id_index.pop(piece_id)
+    piece = inventory.pieces[i]
+    
+    inventory._total_captures -= piece.captures_made
+    inventory._total_evolutions -= piece.evolution_count
+    inventory._rarity_counts[piece.rarity] -= 1
+    if not inventory._rarity_counts[piece.rarity]:
+        del inventory._rarity_counts[piece.rarity]
+    inventory._locked_count -= piece.is_locked
+    
+    # Piece order is not meaningful (lookups go through the id index)
+    last = inventory.pieces.pop()
+    if i != len(inventory.pieces):
+        inventory.pieces[i] = last
+        inventory._id_index[last.id] = i
+    inventory.used_slots = len(inventory.pieces)
 
 
 @router.get("/{owner}", response_model=Inventory)
 async def get_inventory(owner: str):
     """Get player's inventory"""
     inventory = get_or_create_inventory(owner)
-    inventory.used_slots = len(inventory.pieces)
-    return inventory
+    return _cached_response(_inventory_cache, inventory, inventory.model_dump_json)
 
 
 @router.post("/{owner}/save-piece", response_model=APIResponse)
-async def save_piece_to_inventory(
-    owner: str,
-    piece_data: Dict,
-):
+async def save_piece_to_inventory(owner: str, req: SavePieceRequest):
     """Save a piece from completed game to inventory"""
-    inventory = get_or_create_inventory(owner)
-    
-    if len(inventory.pieces) >= inventory.max_slots:
-        raise HTTPException(status_code=400, detail="Inventory full")
-    
-    # Create inventory piece
-    inventory_piece = InventoryPiece(
-        id=len(inventory.pieces) + 1000,  # Unique ID
-        owner=owner,
-        base_type=PieceType(piece_data.get("base_type", "PAWN")),
-        traits=[
-            Trait(
-                name=TraitName(t.get("name", "FORWARD_STEP")),
-                cost=t.get("cost", 1),
-                is_hidden=t.get("is_hidden", False),
-            )
-            for t in piece_data.get("traits", [])
-        ],
-        games_played=piece_data.get("games_played", 1),
-        captures_made=piece_data.get("captures_made", 0),
-        evolution_count=piece_data.get("evolution_count", 0),
-        name=piece_data.get("name", ""),
-        rarity=piece_data.get("rarity", "COMMON"),
-    )
-    
-    inventory.pieces.append(inventory_piece)
-    inventory.used_slots = len(inventory.pieces)
-    
-    logger.info(f"Piece saved to inventory: owner={owner}, piece_id={inventory_piece.id}")
+    async with lock_for(owner):
+        inventory = get_or_create_inventory(owner)
+        
+        if len(inventory.pieces) >= inventory.max_slots:
+            raise HTTPException(status_code=400, detail="Inventory full")
+        
+        # Request body is already validated, so skip re-validation here
+        inventory_piece = InventoryPiece.model_construct(
+            id=next(_piece_id_gen),
+            owner=owner,
+            **dict(req),
+        )
+        
+        _add_piece(inventory, inventory_piece)
+        inventory._version += 1
+        
+    logger.info("Piece saved to inventory: owner=%s, piece_id=%s", owner, inventory_piece.id)
     
-    return APIResponse(
-        success=True,
+    return APIResponse.ok(
         message="Piece saved to inventory",
         data={"piece": inventory_piece},
     )
@@ -89,35 +146,26 @@ async def deploy_piece_from_inventory(
     position: Dict[str, int],
 ):
     """Deploy a piece from inventory to a new game"""
-    inventory = get_or_create_inventory(owner)
-    
-    # Find piece
-    piece = None
-    piece_index = None
-    for i, p in enumerate(inventory.pieces):
-        if p.id == piece_id:
-            piece = p
-            piece_index = i
-            break
-    
-    if piece is None:
-        raise HTTPException(status_code=404, detail="Piece not found")
-    
-    if not piece.is_available:
-        raise HTTPException(status_code=400, detail="Piece not available")
-    
-    if piece.is_locked:
-        raise HTTPException(status_code=400, detail="Piece is locked")
-    
-    # In production, would call smart contract to deploy
-    # For now, mark as unavailable
-    piece.is_available = False
-    piece.games_played += 1
-    
-    logger.info(f"Piece deployed: owner={owner}, piece_id={piece_id}, game_id={game_id}")
-    
-    return APIResponse(
-        success=True,
+    async with lock_for(owner):
+        inventory = get_or_create_inventory(owner)
+        
+        piece = _find_piece(inventory, piece_id)
+        
+        if not piece.is_available:
+            raise HTTPException(status_code=400, detail="Piece not available")
+        
+        if piece.is_locked:
+            raise HTTPException(status_code=400, detail="Piece is locked")
+        
+        # In production, would call smart contract to deploy
+        # For now, mark as unavailable
+        piece.is_available = False
+        piece.games_played += 1
+        inventory._version += 1
+        
+    logger.info("Piece deployed: owner=%s, piece_id=%s, game_id=%s", owner, piece_id, game_id)
+    
+    return APIResponse.ok(
         message="Piece deployed successfully",
         data={
             "piece": piece,
@@ -130,80 +178,73 @@ async def deploy_piece_from_inventory(
 @router.post("/{owner}/lock-piece", response_model=APIResponse)
 async def lock_piece(owner: str, piece_id: int):
     """Lock a piece to prevent deletion"""
-    inventory = get_or_create_inventory(owner)
-    
-    piece = next((p for p in inventory.pieces if p.id == piece_id), None)
-    if piece is None:
-        raise HTTPException(status_code=404, detail="Piece not found")
-    
-    piece.is_locked = True
-    
-    logger.info(f"Piece locked: owner={owner}, piece_id={piece_id}")
-    
-    return APIResponse(
-        success=True,
-        message="Piece locked",
-    )
+    async with lock_for(owner):
+        inventory = get_or_create_inventory(owner)
+        
+        piece = _find_piece(inventory, piece_id)
+        
+        if not piece.is_locked:
+            piece.is_locked = True
+            inventory._locked_count += 1
+            inventory._version += 1
+        
+    logger.info("Piece locked: owner=%s, piece_id=%s", owner, piece_id)
+    
+    return APIResponse.ok("Piece locked")
 
 
 @router.post("/{owner}/unlock-piece", response_model=APIResponse)
 async def unlock_piece(owner: str, piece_id: int):
     """Unlock a piece"""
-    inventory = get_or_create_inventory(owner)
-    
-    piece = next((p for p in inventory.pieces if p.id == piece_id), None)
-    if piece is None:
-        raise HTTPException(status_code=404, detail="Piece not found")
-    
-    piece.is_locked = False
-    
-    logger.info(f"Piece unlocked: owner={owner}, piece_id={piece_id}")
-    
-    return APIResponse(
-        success=True,
-        message="Piece unlocked",
-    )
+    async with lock_for(owner):
+        inventory = get_or_create_inventory(owner)
+        
+        piece = _find_piece(inventory, piece_id)
+        
+        if piece.is_locked:
+            piece.is_locked = False
+            inventory._locked_count -= 1
+            inventory._version += 1
+        
+    logger.info("Piece unlocked: owner=%s, piece_id=%s", owner, piece_id)
+    
+    return APIResponse.ok("Piece unlocked")
 
 
 @router.delete("/{owner}/piece/{piece_id}", response_model=APIResponse)
 async def delete_piece(owner: str, piece_id: int):
     """Delete a piece from inventory"""
-    inventory = get_or_create_inventory(owner)
-    
-    piece = next((p for p in inventory.pieces if p.id == piece_id), None)
-    if piece is None:
-        raise HTTPException(status_code=404, detail="Piece not found")
-    
-    if piece.is_locked:
-        raise HTTPException(status_code=400, detail="Cannot delete locked piece")
-    
-    inventory.pieces = [p for p in inventory.pieces if p.id != piece_id]
-    inventory.used_slots = len(inventory.pieces)
-    
-    logger.info(f"Piece deleted: owner={owner}, piece_id={piece_id}")
-    
-    return APIResponse(
-        success=True,
-        message="Piece deleted",
-    )
+    async with lock_for(owner):
+        inventory = get_or_create_inventory(owner)
+        
+        piece = _find_piece(inventory, piece_id)
+        
+        if piece.is_locked:
+            raise HTTPException(status_code=400, detail="Cannot delete locked piece")
+        
+        _remove_piece(inventory, piece_id)
+        inventory._version += 1
+        
+    logger.info("Piece deleted: owner=%s, piece_id=%s", owner, piece_id)
+    
+    return APIResponse.ok("Piece deleted")
 
 
 @router.post("/{owner}/rename-piece", response_model=APIResponse)
 async def rename_piece(owner: str, piece_id: int, new_name: str):
     """Rename a piece"""
-    inventory = get_or_create_inventory(owner)
-    
-    piece = next((p for p in inventory.pieces if p.id == piece_id), None)
-    if piece is None:
-        raise HTTPException(status_code=404, detail="Piece not found")
-    
-    old_name = piece.name
-    piece.name = new_name
-    
-    logger.info(f"Piece renamed: owner={owner}, piece_id={piece_id}, '{old_name}' -> '{new_name}'")
-    
-    return APIResponse(
-        success=True,
+    async with lock_for(owner):
+        inventory = get_or_create_inventory(owner)
+        
+        piece = _find_piece(inventory, piece_id)
+        
+        old_name = piece.name
+        piece.name = new_name
+        inventory._version += 1
+        
+    logger.info("Piece renamed: owner=%s, piece_id=%s, '%s' -> '%s'", owner, piece_id, old_name, new_name)
+    
+    return APIResponse.ok(
         message="Piece renamed",
         data={"old_name": old_name, "new_name": new_name},
     )
@@ -214,11 +255,9 @@ async def get_piece_details(owner: str, piece_id: int):
     """Get detailed information about a specific piece"""
     inventory = get_or_create_inventory(owner)
     
-    piece = next((p for p in inventory.pieces if p.id == piece_id), None)
-    if piece is None:
-        raise HTTPException(status_code=404, detail="Piece not found")
+    piece = _find_piece(inventory, piece_id)
     
-    return piece
+    return model_response(piece)
 
 
 @router.get("/{owner}/stats", response_model=Dict)
@@ -226,21 +265,14 @@ async def get_inventory_stats(owner: str):
     """Get inventory statistics"""
     inventory = get_or_create_inventory(owner)
     
-    total_captures = sum(p.captures_made for p in inventory.pieces)
-    total_evolutions = sum(p.evolution_count for p in inventory.pieces)
-    
-    rarity_counts = {}
-    for piece in inventory.pieces:
-        rarity = piece.rarity
-        rarity_counts[rarity] = rarity_counts.get(rarity, 0) + 1
-    
-    return {
+    # Reuse the encoded response until the inventory changes
+    return _cached_response(_stats_cache, inventory, lambda: orjson.dumps({
         "owner": owner,
         "total_pieces": len(inventory.pieces),
         "max_slots": inventory.max_slots,
         "available_slots": inventory.max_slots - len(inventory.pieces),
-        "total_captures": total_captures,
-        "total_evolutions": total_evolutions,
-        "rarity_distribution": rarity_counts,
-        "locked_pieces": sum(1 for p in inventory.pieces if p.is_locked),
-    }
+        "total_captures": inventory._total_captures,
+        "total_evolutions": inventory._total_evolutions,
+        "rarity_distribution": dict(inventory._rarity_counts),
+        "locked_pieces": inventory._locked_count,
+    }))
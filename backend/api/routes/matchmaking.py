@@ -19,7 +19,7 @@ router = APIRouter()
 matchmaking_service: Optional[MatchmakingService] = None
 
 
-def get_matchmaking_service() -> MatchmakingService:
+async def get_matchmaking_service() -> MatchmakingService:
     """Get matchmaking service instance"""
     global matchmaking_service
     if matchmaking_service is None:
@@ -36,13 +36,12 @@ async def join_queue(
     try:
         status = await service.queue_player(request)
         
-        return APIResponse(
-            success=True,
+        return APIResponse.ok(
             message="Joined matchmaking queue",
             data={"queue_status": status},
         )
     except Exception as e:
-        logger.error(f"Failed to join queue: {e}")
+        logger.error("Failed to join queue: %s", e)
         raise HTTPException(status_code=500, detail="Failed to join queue")
 
 
@@ -58,14 +57,11 @@ async def cancel_queue(
         if not success:
             raise HTTPException(status_code=404, detail="Player not in queue")
         
-        return APIResponse(
-            success=True,
-            message="Left matchmaking queue",
-        )
+        return APIResponse.ok("Left matchmaking queue")
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to cancel queue: {e}")
+        logger.error("Failed to cancel queue: %s", e)
         raise HTTPException(status_code=500, detail="Failed to cancel queue")
 
 
@@ -107,8 +103,7 @@ async def accept_match(
     
     # In production, would confirm both players ready
     
-    return APIResponse(
-        success=True,
+    return APIResponse.ok(
         message="Match accepted",
         data={"game_id": game_id},
     )
@@ -5,72 +5,98 @@ Players API Routes - Handle player stats, ELO, and profiles
 from fastapi import APIRouter, HTTPException
 from typing import Dict, Optional
 import logging
+import msgspec
 
 from models.schemas import (
     PlayerStats, ELOData, APIResponse,
 )
+from services.players_arrays import PlayerArrays
+from api.responses import ORJSONResponse, struct_response
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 # In-memory storage (would use database in production)
-players_db: Dict[str, PlayerStats] = {}
+players_db = PlayerArrays()
 
 
-def get_or_create_player(address: str) -> PlayerStats:
-    """Get existing player or create new one"""
-    if address not in players_db:
-        players_db[address] = PlayerStats(
-            address=address,
-            elo=ELOData(player_address=address),
-        )
-    return players_db[address]
+def get_or_create_player(address: str) -> int:
+    """Get existing player slot or create new one"""
+    return players_db.get_or_create(address)
+
+
+@router.get("/leaderboard", response_model=Dict)
+async def get_leaderboard(limit: int = 100):
+    """Get global leaderboard"""
+    # Read the head of the write-maintained ELO index
+    top = players_db.top(limit)
+    
+    elo = players_db.elo_current[top].tolist()
+    wins = players_db.wins[top].tolist()
+    games = players_db.games_played[top].tolist()
+    addresses = players_db.addresses
+    
+    return ORJSONResponse({
+        "leaderboard": [
+            {
+                "rank": rank,
+                "address": addresses[i],
+                "elo": e,
+                "wins": w,
+                "games_played": g,
+                "win_rate": w / g if g > 0 else 0.0,
+            }
+            for rank, i, e, w, g in zip(range(1, len(top) + 1), top.tolist(), elo, wins, games)
+        ],
+        "total_players": len(players_db),
+    })
 
 
 @router.get("/{address}", response_model=PlayerStats)
 async def get_player_stats(address: str):
     """Get player statistics"""
-    player = get_or_create_player(address)
-    return player
+    i = get_or_create_player(address)
+    return struct_response(players_db.to_stats(i))
 
 
 @router.get("/{address}/elo", response_model=ELOData)
 async def get_player_elo(address: str):
     """Get player ELO rating"""
-    player = get_or_create_player(address)
-    return player.elo
+    i = get_or_create_player(address)
+    return struct_response(players_db.to_elo(i))
 
 
 @router.post("/{address}/register", response_model=APIResponse)
 async def register_player(address: str):
     """Register a new player"""
-    player = get_or_create_player(address)
+    i = get_or_create_player(address)
     
-    logger.info(f"Player registered: {address}")
+    logger.info("Player registered: %s", address)
     
-    return APIResponse(
-        success=True,
+    return APIResponse.ok(
         message="Player registered successfully",
-        data={"player": player},
+        data={"player": msgspec.to_builtins(players_db.to_stats(i))},
     )
 
 
 @router.post("/{address}/update-elo", response_model=APIResponse)
 async def update_player_elo(address: str, new_elo: int):
     """Update player ELO after game"""
-    player = get_or_create_player(address)
+    i = get_or_create_player(address)
     
-    old_elo = player.elo.current_elo
-    player.elo.current_elo = new_elo
+    old_elo = int(players_db.elo_current[i])
+    try:
+        players_db.set_elo(i, new_elo)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    if new_elo > player.elo.highest_elo:
-        player.elo.highest_elo = new_elo
+    if new_elo > players_db.elo_highest[i]:
+        players_db.elo_highest[i] = new_elo
     
-    logger.info(f"Player {address} ELO updated: {old_elo} -> {new_elo}")
+    logger.info("Player %s ELO updated: %s -> %s", address, old_elo, new_elo)
     
-    return APIResponse(
-        success=True,
+    return APIResponse.ok(
         message="ELO updated successfully",
         data={"old_elo": old_elo, "new_elo": new_elo},
     )
@@ -84,39 +110,37 @@ async def record_game_result(
     elo_change: int,
 ):
     """Record game result and update stats"""
-    player = get_or_create_player(address)
+    i = get_or_create_player(address)
+    db = players_db
+    
+    # Apply the ELO first so a rejected change leaves the stats untouched
+    try:
+        db.set_elo(i, int(db.elo_current[i]) + elo_change)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    player.elo.games_played += 1
-    player.elo.current_elo += elo_change
+    db.games_played[i] += 1
     
-    if player.elo.current_elo > player.elo.highest_elo:
-        player.elo.highest_elo = player.elo.current_elo
+    if db.elo_current[i] > db.elo_highest[i]:
+        db.elo_highest[i] = db.elo_current[i]
     
     if result == "win":
-        player.elo.wins += 1
-        player.elo.win_streak += 1
-        if player.elo.win_streak > player.elo.best_win_streak:
-            player.elo.best_win_streak = player.elo.win_streak
+        db.wins[i] += 1
+        db.win_streak[i] += 1
+        if db.win_streak[i] > db.best_win_streak[i]:
+            db.best_win_streak[i] = db.win_streak[i]
     elif result == "loss":
-        player.elo.losses += 1
-        player.elo.win_streak = 0
+        db.losses[i] += 1
+        db.win_streak[i] = 0
     else:  # draw
-        player.elo.draws += 1
-        player.elo.win_streak = 0
-    
-    # Update win rate
-    if player.elo.games_played > 0:
-        player.win_rate = player.elo.wins / player.elo.games_played
+        db.draws[i] += 1
+        db.win_streak[i] = 0
     
-    player.total_games = player.elo.games_played
-    player.total_wins = player.elo.wins
+    logger.info("Game result recorded for %s: %s, ELO change: %s", address, result, elo_change)
     
-    logger.info(f"Game result recorded for {address}: {result}, ELO change: {elo_change}")
-    
-    return APIResponse(
-        success=True,
+    return APIResponse.ok(
         message="Game result recorded",
-        data={"player": player},
+        data={"player": msgspec.to_builtins(db.to_stats(i))},
     )
 
 
@@ -129,29 +153,3 @@ async def get_player_history(address: str, limit: int = 20):
         "games": [],
         "total": 0,
     }
-
-
-@router.get("/leaderboard", response_model=Dict)
-async def get_leaderboard(limit: int = 100):
-    """Get global leaderboard"""
-    # Sort players by ELO
-    sorted_players = sorted(
-        players_db.values(),
-        key=lambda p: p.elo.current_elo,
-        reverse=True,
-    )[:limit]
-    
-    return {
-        "leaderboard": [
-            {
-                "rank": i + 1,
-                "address": p.address,
-                "elo": p.elo.current_elo,
-                "wins": p.elo.wins,
-                "games_played": p.elo.games_played,
-                "win_rate": p.win_rate,
-            }
-            for i, p in enumerate(sorted_players)
-        ],
-        "total_players": len(players_db),
-    }
@@ -6,16 +6,25 @@ FastAPI server for off-chain services including matchmaking, AI integration, and
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-import asyncio
+import logging
+import os
 from typing import Dict, List, Optional
+import orjson
 
+from api.responses import ORJSONResponse
 from api.routes import games, players, matchmaking, inventory
 from services.starknet_service import StarknetService
 from services.matchmaking_service import MatchmakingService
 from services.ai_service import AIService
+from services.connection_manager import connection_manager
 from models.schemas import HealthCheck, ServerStatus
 
 
+# Route modules log every mutation at INFO; set LOG_LEVEL=warning in production
+LOG_LEVEL = os.getenv("LOG_LEVEL", "info")
+logging.getLogger("api.routes").setLevel(LOG_LEVEL.upper())
+
+
 # Global services
 starknet_service: Optional[StarknetService] = None
 matchmaking_service: Optional[MatchmakingService] = None
@@ -46,6 +55,7 @@ async def lifespan(app: FastAPI):
     print("👋 Shutting down Gambit Engine Backend...")
     if matchmaking_service:
         await matchmaking_service.shutdown()
+    await connection_manager.shutdown()
     print("✅ Shutdown complete")
 
 
@@ -54,6 +64,7 @@ app = FastAPI(
     description="Backend API for The Gambit Engine - DNA-encoded, on-chain chess RPG",
     version="0.1.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware
@@ -104,30 +115,29 @@ async def game_websocket(websocket: WebSocket, game_id: int):
     
     try:
         # Subscribe to game updates
-        await websocket.send_json({
+        await connection_manager.connect(game_id, websocket)
+        await websocket.send_bytes(orjson.dumps({
             "type": "connected",
             "game_id": game_id,
             "message": "Connected to game updates"
-        })
+        }))
         
-        # Keep connection alive and handle messages
+        # Keepalive is handled by protocol-level ping frames (see uvicorn.run)
         while True:
-            try:
-                data = await asyncio.wait_for(websocket.receive_text(), timeout=30.0)
-                # Handle incoming messages (moves, chat, etc.)
-                await websocket.send_json({
-                    "type": "ack",
-                    "message": "Message received"
-                })
-            except asyncio.TimeoutError:
-                # Send ping to keep connection alive
-                await websocket.send_json({"type": "ping"})
+            data = await websocket.receive_text()
+            # Handle incoming messages (moves, chat, etc.)
+            await websocket.send_bytes(orjson.dumps({
+                "type": "ack",
+                "message": "Message received"
+            }))
                 
     except WebSocketDisconnect:
         print(f"Client disconnected from game {game_id}")
     except Exception as e:
         print(f"WebSocket error: {e}")
         await websocket.close()
+    finally:
+        connection_manager.disconnect(game_id, websocket)
 
 
 # Error handlers
@@ -148,5 +158,7 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=8000,
         reload=True,
-        log_level="info",
+        log_level=LOG_LEVEL,
+        ws_ping_interval=20.0,
+        ws_ping_timeout=20.0,
     )
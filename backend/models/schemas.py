@@ -2,62 +2,39 @@
 Pydantic models and schemas for The Gambit Engine API
 """
 
-from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
-from enum import Enum
+from pydantic import BaseModel, Field, PrivateAttr, computed_field
+from typing import Optional, List, Dict, Any, Literal
+from collections import Counter
 from datetime import datetime
 
 
-# ============ Enums ============
+# ============ Literal Types ============
 
-class PieceType(str, Enum):
-    PAWN = "PAWN"
-    KNIGHT = "KNIGHT"
-    BISHOP = "BISHOP"
-    ROOK = "ROOK"
-    QUEEN = "QUEEN"
-    KING = "KING"
+PieceType = Literal["PAWN", "KNIGHT", "BISHOP", "ROOK", "QUEEN", "KING"]
 
+PieceColor = Literal["WHITE", "BLACK"]
 
-class PieceColor(str, Enum):
-    WHITE = "WHITE"
-    BLACK = "BLACK"
+TraitName = Literal[
+    "FORWARD_STEP",
+    "LEAP",
+    "DIAGONAL",
+    "STRAIGHT",
+    "COMBINED",
+    "ADJACENT",
+    "EXTENDED_RANGE",
+    "PHANTOM_LEAP",
+    "DOUBLE_MOVE",
+    "TELEPORT",
+    "HIDDEN_ABILITY",
+    "ETHEREAL",
+    "AUTONOMOUS_AI",
+]
 
+OpponentType = Literal["HUMAN", "AI", "ANY"]
 
-class TraitName(str, Enum):
-    FORWARD_STEP = "FORWARD_STEP"
-    LEAP = "LEAP"
-    DIAGONAL = "DIAGONAL"
-    STRAIGHT = "STRAIGHT"
-    COMBINED = "COMBINED"
-    ADJACENT = "ADJACENT"
-    EXTENDED_RANGE = "EXTENDED_RANGE"
-    PHANTOM_LEAP = "PHANTOM_LEAP"
-    DOUBLE_MOVE = "DOUBLE_MOVE"
-    TELEPORT = "TELEPORT"
-    HIDDEN_ABILITY = "HIDDEN_ABILITY"
-    ETHEREAL = "ETHEREAL"
-    AUTONOMOUS_AI = "AUTONOMOUS_AI"
+GameStatus = Literal["WAITING", "PLAYING", "COMPLETED"]
 
-
-class OpponentType(str, Enum):
-    HUMAN = "HUMAN"
-    AI = "AI"
-    ANY = "ANY"
-
-
-class GameStatus(str, Enum):
-    WAITING = "WAITING"
-    PLAYING = "PLAYING"
-    COMPLETED = "COMPLETED"
-
-
-class GameEndReason(str, Enum):
-    CHECKMATE = "CHECKMATE"
-    STALEMATE = "STALEMATE"
-    RESIGNATION = "RESIGNATION"
-    DRAW = "DRAW"
-    TIMEOUT = "TIMEOUT"
+GameEndReason = Literal["CHECKMATE", "STALEMATE", "RESIGNATION", "DRAW", "TIMEOUT"]
 
 
 # ============ Base Models ============
@@ -95,7 +72,7 @@ class GameState(BaseModel):
     winner: Optional[str] = None
     gas_white: int = 10
     gas_black: int = 10
-    status: GameStatus = GameStatus.WAITING
+    status: GameStatus = "WAITING"
     created_at: datetime = Field(default_factory=datetime.utcnow)
     last_move_at: Optional[datetime] = None
 
@@ -169,9 +146,23 @@ class ELOData(BaseModel):
 class PlayerStats(BaseModel):
     address: str
     elo: ELOData
-    total_games: int = 0
-    total_wins: int = 0
-    win_rate: float = 0.0
+    
+    # Derived from the ELO record, so there is nothing to keep in sync
+    @computed_field
+    @property
+    def total_games(self) -> int:
+        return self.elo.games_played
+    
+    @computed_field
+    @property
+    def total_wins(self) -> int:
+        return self.elo.wins
+    
+    @computed_field
+    @property
+    def win_rate(self) -> float:
+        games = self.elo.games_played
+        return self.elo.wins / games if games > 0 else 0.0
 
 
 # ============ Inventory Models ============
@@ -190,18 +181,41 @@ class InventoryPiece(BaseModel):
     rarity: str = "COMMON"
 
 
+class SavePieceRequest(BaseModel):
+    base_type: PieceType = "PAWN"
+    traits: List[Trait] = []
+    games_played: int = 1
+    captures_made: int = 0
+    evolution_count: int = 0
+    name: str = ""
+    rarity: str = "COMMON"
+
+
 class Inventory(BaseModel):
     owner: str
     pieces: List[InventoryPiece]
     max_slots: int = 10
     used_slots: int = 0
+    
+    # Incremented on every mutation; keys the routes' encoded-response caches
+    _version: int = PrivateAttr(default=0)
+    
+    # piece id -> index in pieces, maintained by the inventory routes
+    _id_index: Dict[int, int] = PrivateAttr(default_factory=dict)
+    
+    # Running aggregates for inventory stats, maintained on every write
+    _total_captures: int = PrivateAttr(default=0)
+    _total_evolutions: int = PrivateAttr(default=0)
+    _rarity_counts: Counter = PrivateAttr(default_factory=Counter)
+    _locked_count: int = PrivateAttr(default=0)
 
 
 # ============ Matchmaking Models ============
 
 class MatchmakingRequest(BaseModel):
     player: str
-    preferred_opponent: OpponentType = OpponentType.ANY
+    player_elo: int = 1200
+    preferred_opponent: OpponentType = "ANY"
     min_elo: int = 0
     max_elo: int = 3000
 
@@ -212,14 +226,14 @@ class MatchFound(BaseModel):
     opponent_elo: int
     is_bot: bool
     bot_level: Optional[int] = None
-    color: PieceColor = PieceColor.WHITE
+    color: PieceColor = "WHITE"
 
 
 class QueueStatus(BaseModel):
     is_queued: bool
     queue_position: int = 0
     estimated_wait_seconds: int = 0
-    preferred_opponent: OpponentType = OpponentType.ANY
+    preferred_opponent: OpponentType = "ANY"
 
 
 # ============ Evolution Models ============
@@ -266,6 +280,11 @@ class APIResponse(BaseModel):
     success: bool
     message: str
     data: Optional[Any] = None
+    
+    @classmethod
+    def ok(cls, message: str = "ok", data: Any = None) -> Dict[str, Any]:
+        """Success body as a plain dict; response_model=APIResponse validates it once on the way out"""
+        return {"success": True, "message": message, "data": data}
 
 
 class PaginatedResponse(BaseModel):
@@ -0,0 +1,76 @@
+"""
+msgspec structs for trusted internal state served on hot read paths
+"""
+
+import msgspec
+from typing import Optional
+from datetime import datetime
+
+from models.schemas import GameStatus, PieceType
+
+
+# Mirrors of the Pydantic response models in models.schemas. These hold
+# server-built state only; request bodies are still validated by Pydantic.
+
+# ============ Game Models ============
+
+class Position(msgspec.Struct):
+    file: int
+    rank: int
+
+
+class GameState(msgspec.Struct):
+    id: int
+    player_white: str
+    player_black: str
+    current_turn: str
+    move_count: int
+    is_check: bool = False
+    is_checkmate: bool = False
+    is_stalemate: bool = False
+    winner: Optional[str] = None
+    gas_white: int = 10
+    gas_black: int = 10
+    status: GameStatus = "WAITING"
+    created_at: datetime = msgspec.field(default_factory=datetime.utcnow)
+    last_move_at: Optional[datetime] = None
+
+
+# ============ Player Models ============
+
+class ELOData(msgspec.Struct):
+    player_address: str
+    current_elo: int = 1200
+    highest_elo: int = 1200
+    games_played: int = 0
+    wins: int = 0
+    losses: int = 0
+    draws: int = 0
+    win_streak: int = 0
+    best_win_streak: int = 0
+
+
+class PlayerStats(msgspec.Struct):
+    address: str
+    elo: ELOData
+    
+    # Derived columns, filled from the ELO record by PlayerArrays.to_stats
+    total_games: int = 0
+    total_wins: int = 0
+    win_rate: float = 0.0
+
+
+# ============ AI Models ============
+
+class AIMoveOut(msgspec.Struct, kw_only=True, frozen=True, omit_defaults=True):
+    piece_id: int
+    from_: Position = msgspec.field(name="from")
+    to: Position
+    is_special: bool
+    special_data: Optional[str] = None
+    bot_level: int
+    calculation_time_ms: int
+    promotion: Optional[PieceType] = None
+    
+    # Set on ghost moves once a Giza proof is attached
+    verifiable: Optional[bool] = None
@@ -0,0 +1,69 @@
+"""
+Locust load profile - mixed leaderboard, inventory stats, and move traffic
+"""
+
+import random
+from locust import HttpUser, task, between
+
+
+# Fixed address pool so leaderboard and inventories grow realistically
+PLAYERS = [f"0xload{i:04d}" for i in range(500)]
+
+
+class GambitUser(HttpUser):
+    """Simulated player hitting the hot read and write endpoints"""
+    
+    wait_time = between(0, 0.05)
+    
+    def on_start(self):
+        self.address = random.choice(PLAYERS)
+        self.client.post(f"/api/players/{self.address}/register", name="/api/players/[address]/register")
+        
+        with self.client.post(
+            f"/api/inventory/{self.address}/save-piece",
+            json={
+                "base_type": "KNIGHT",
+                "traits": [{"name": "LEAP", "cost": 2}],
+                "captures_made": random.randint(0, 5),
+                "rarity": random.choice(["COMMON", "RARE", "EPIC"]),
+            },
+            name="/api/inventory/[owner]/save-piece",
+            catch_response=True,
+        ) as response:
+            # A reused address may already have a full inventory
+            response.success()
+        
+        game = self.client.post("/api/games/", json={"player_white": self.address}).json()
+        self.game_id = game["data"]["game_id"]
+    
+    @task(5)
+    def leaderboard(self):
+        self.client.get("/api/players/leaderboard", params={"limit": 100})
+    
+    @task(3)
+    def inventory_stats(self):
+        self.client.get(f"/api/inventory/{self.address}/stats", name="/api/inventory/[owner]/stats")
+    
+    @task(3)
+    def make_move(self):
+        self.client.post(
+            f"/api/games/{self.game_id}/move",
+            json={
+                "piece_id": 1,
+                "from": {"file": 4, "rank": 1},
+                "to": {"file": 4, "rank": 3},
+            },
+            name="/api/games/[game_id]/move",
+        )
+    
+    @task(1)
+    def game_result(self):
+        self.client.post(
+            f"/api/players/{self.address}/game-result",
+            params={
+                "result": random.choice(["win", "loss", "draw"]),
+                "opponent_elo": 1200,
+                "elo_change": random.randint(-16, 16),
+            },
+            name="/api/players/[address]/game-result",
+        )
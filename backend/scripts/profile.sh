@@ -0,0 +1,36 @@
+#!/usr/bin/env bash
+# Record a py-spy flame graph of the API server under mixed Locust load.
+#
+# Usage: scripts/profile.sh [duration_seconds] [output.svg]
+#
+# Needs py-spy and locust (pip install py-spy locust). They are perf tools,
+# not runtime dependencies, so they are not in requirements.txt. py-spy may
+# need sudo (or ptrace permissions) to sample the server process.
+set -euo pipefail
+
+cd "$(dirname "$0")/.."
+
+DURATION="${1:-60}"
+OUTPUT="${2:-flame.svg}"
+HOST="127.0.0.1"
+PORT="${PORT:-8000}"
+USERS="${USERS:-100}"
+
+py-spy record --subprocesses --rate 250 -o "$OUTPUT" -- \
+    uvicorn main:app --host "$HOST" --port "$PORT" --log-level warning &
+SPY_PID=$!
+
+# Wait for the server to come up
+until curl -sf "http://$HOST:$PORT/health" > /dev/null; do
+    sleep 0.5
+done
+
+locust -f scripts/locustfile.py --headless \
+    --host "http://$HOST:$PORT" \
+    --users "$USERS" --spawn-rate 20 --run-time "${DURATION}s" || true
+
+# Stop uvicorn; py-spy writes the flame graph once its child exits
+pkill -INT -f "uvicorn main:app --host $HOST --port $PORT"
+wait "$SPY_PID"
+
+echo "Flame graph written to $OUTPUT"
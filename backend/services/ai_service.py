@@ -3,19 +3,78 @@ AI Service - Handles AI opponent logic and Giza integration for verifiable AI
 """
 
 import asyncio
-import random
 import logging
-from typing import Dict, List, Optional, Tuple, Any
-from dataclasses import dataclass
-import chess  # python-chess library for board logic
+import time
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional, Tuple, Union, Any
+from collections import OrderedDict
+from functools import cached_property
+import msgspec
+import numpy as np
 
-from models.schemas import PieceType, PieceColor, Position
+from models.schemas import PieceType, PieceColor
+from models.schemas_fast import AIMoveOut, Position
+from services.bitboard import (
+    BitboardState, STARTING_FEN, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING,
+    square_file as sq_file, square_rank as sq_rank,
+    MOVE_NORMAL, MOVE_EN_PASSANT, MOVE_CASTLING, encode_move, move_promotion, move_uci,
+)
+from services.eval_kernel import NUMBA_AVAILABLE, PIECE_VALUES, PSQT, PSQT_VALUES, eval_board
+
+if TYPE_CHECKING:
+    import chess  # python-chess is imported lazily, on the first AI move
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
-class BotConfig:
+class _SearchTimeout(Exception):
+    """Raised inside the search once the iterative-deepening deadline passes"""
+
+# Moves produced here are server-generated and trusted, so they are returned as
+# unvalidated msgspec structs. Client input (FEN, ghost_config) is never trusted.
+
+
+# Transposition table bounds and capacity
+TT_EXACT, TT_LOWER, TT_UPPER = 0, 1, 2
+TT_MAX_ENTRIES = 1 << 20
+
+# Move ordering: piece values by type for MVV-LVA, and killer slots per remaining depth
+ORDER_VALUES = (0, 1, 3, 3, 5, 9, 100)
+MAX_SEARCH_DEPTH = 64
+
+# Checkmate score (white-positive), less one per ply from the search root;
+# anything past MATE_THRESHOLD is a forced mate
+MATE_SCORE = 10000.0
+MATE_THRESHOLD = 9000
+
+
+def _score_to_tt(score: float, ply: int) -> float:
+    """Rebase a mate score from root distance to distance from the node at ply"""
+    if score > MATE_THRESHOLD:
+        return score + ply
+    if score < -MATE_THRESHOLD:
+        return score - ply
+    return score
+
+
+def _score_from_tt(score: float, ply: int) -> float:
+    """Rebase a stored mate score back to distance from the root"""
+    if score > MATE_THRESHOLD:
+        return score - ply
+    if score < -MATE_THRESHOLD:
+        return score + ply
+    return score
+
+# Captures searched past the nominal depth before standing pat
+QSEARCH_MAX_DEPTH = 4
+
+# Wall-clock budget for one iterative-deepening search, in seconds
+SEARCH_TIME_BUDGET = 1.0
+
+# Uniform(-1, 1) draws taken per refill of the move-noise buffer
+NOISE_BUFFER_SIZE = 4096
+
+
+class BotConfig(NamedTuple):
     """Configuration for AI bot difficulty"""
     level: int
     base_elo: int
@@ -26,36 +85,70 @@ class BotConfig:
     endgame_table: bool  # Use endgame tablebase
 
 
+# Bot difficulty configurations, indexed by level - 1
+_BOT_CONFIGS = (
+    BotConfig(1, 400, 10, 1, 30, False, False),
+    BotConfig(2, 600, 15, 1, 25, False, False),
+    BotConfig(3, 800, 20, 2, 20, True, False),
+    BotConfig(4, 1000, 25, 2, 15, True, False),
+    BotConfig(5, 1200, 30, 3, 12, True, False),
+    BotConfig(6, 1400, 35, 3, 10, True, True),
+    BotConfig(7, 1600, 40, 4, 8, True, True),
+    BotConfig(8, 1800, 45, 4, 6, True, True),
+    BotConfig(9, 2000, 50, 5, 4, True, True),
+    BotConfig(10, 2200, 55, 6, 2, True, True),
+)
+
+# Standard piece values by piece type (index 0 unused)
+_PIECE_VALUES = (0.0, 1.0, 3.0, 3.0, 5.0, 9.0, 100.0)
+
+# Opening book source: position FEN -> UCI moves, packed into AIService.opening_book
+_OPENING_LINES = {
+    STARTING_FEN: ("e2e4", "d2d4", "c2c4", "g1f3"),  # Common white openings
+}
+
+# Ranks 5-8, where moves earn the aggression bonus
+_HIGH_RANK_MASK = 0xFFFFFFFF00000000
+
+
 class AIService:
     """Service for AI opponent logic and Giza integration"""
     
     def __init__(self):
-        self.bot_configs = self._init_bot_configs()
-        self.opening_book = self._init_opening_book()
         self._giza_connected = False
         
-    def _init_bot_configs(self) -> Dict[int, BotConfig]:
-        """Initialize bot difficulty configurations"""
-        return {
-            1: BotConfig(1, 400, 10, 1, 30, False, False),
-            2: BotConfig(2, 600, 15, 1, 25, False, False),
-            3: BotConfig(3, 800, 20, 2, 20, True, False),
-            4: BotConfig(4, 1000, 25, 2, 15, True, False),
-            5: BotConfig(5, 1200, 30, 3, 12, True, False),
-            6: BotConfig(6, 1400, 35, 3, 10, True, True),
-            7: BotConfig(7, 1600, 40, 4, 8, True, True),
-            8: BotConfig(8, 1800, 45, 4, 6, True, True),
-            9: BotConfig(9, 2000, 50, 5, 4, True, True),
-            10: BotConfig(10, 2200, 55, 6, 2, True, True),
-        }
-    
-    def _init_opening_book(self) -> Dict[str, List[str]]:
-        """Initialize opening book with common chess openings"""
-        return {
-            "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1": [
-                "e2e4", "d2d4", "c2c4", "g1f3",  # Common white openings
-            ],
-        }
+        # PCG64 stream; per-move noise is pre-drawn in batches
+        self._rng = np.random.default_rng()
+        self._noise_buf: List[float] = self._rng.uniform(-1, 1, size=NOISE_BUFFER_SIZE).tolist()
+        self._noise_i = 0
+        
+        # Zobrist key -> (depth, score, flag, best move), evicted FIFO
+        self._tt: "OrderedDict[int, Tuple[int, float, int, Optional[int]]]" = OrderedDict()
+        
+        # Two most recent quiet moves that caused a beta cutoff, per remaining depth (0 = empty)
+        self._killers: List[Tuple[int, int]] = [(0, 0)] * MAX_SEARCH_DEPTH
+        
+        # Monotonic time past which the running search aborts
+        self._deadline = float('inf')
+        
+        # Ply of the position the running search started from
+        self._root_ply = 0
+        
+        # Bitboards handed to the evaluation kernel, refilled in place per node
+        self._bbs_buf = np.zeros(12, dtype=np.uint64)
+        
+        # Compile the evaluation kernel now rather than on the first AI move
+        if NUMBA_AVAILABLE:
+            eval_board(self._bbs_buf, PSQT, PIECE_VALUES)
+        
+    @cached_property
+    def opening_book(self) -> Dict[int, Tuple[int, ...]]:
+        """Opening book keyed by Zobrist hash, holding packed moves, built on first use"""
+        book = {}
+        for fen, ucis in _OPENING_LINES.items():
+            state = BitboardState.from_fen(fen)
+            book[state.key] = tuple(move for move in state.legal_moves() if move_uci(move) in ucis)
+        return book
     
     async def connect_giza(self, api_key: str) -> bool:
         """Connect to Giza Network for verifiable AI"""
@@ -66,21 +159,20 @@ class AIService:
             logger.info("Connected to Giza Network")
             return True
         except Exception as e:
-            logger.error(f"Failed to connect to Giza: {e}")
+            logger.error("Failed to connect to Giza: %s", e)
             return False
     
     def get_bot_config(self, level: int) -> BotConfig:
         """Get bot configuration for a specific level"""
-        level = max(1, min(10, level))
-        return self.bot_configs[level]
+        return _BOT_CONFIGS[max(0, min(9, level - 1))]
     
     async def get_move(
         self,
         board_fen: str,
         bot_level: int,
-        color: PieceColor = PieceColor.BLACK,
+        color: PieceColor = "BLACK",
         game_context: Optional[Dict] = None,
-    ) -> Dict[str, Any]:
+    ) -> Union[AIMoveOut, Dict[str, Any]]:
         """
         Get AI move for current board state
         
@@ -91,71 +183,90 @@ class AIService:
             game_context: Additional game context (captures, traits, etc.)
             
         Returns:
-            Dictionary with move data and optional proof for Giza
+            AIMoveOut struct (encode with api.responses.struct_response),
+            or an error dictionary when no move exists
         """
+        import chess  # Deferred so the library only loads once the AI is used
+        
         config = self.get_bot_config(bot_level)
         
         try:
-            # Parse board state
-            board = chess.Board(board_fen) if board_fen else chess.Board()
+            # Decode straight to bitboards; no chess.Board is needed for the search
+            state = BitboardState.from_fen(board_fen or STARTING_FEN)
             
             # Get legal moves
-            legal_moves = list(board.legal_moves)
+            legal_moves = state.legal_moves()
             if not legal_moves:
                 return {"error": "No legal moves available"}
             
             # Check opening book for early game
-            if config.opening_book and board.move_count < 10:
-                opening_move = self._get_opening_move(board.fen())
-                if opening_move:
+            if config.opening_book and state.ply < 10:
+                opening_move = self._get_opening_move(state.key)
+                if opening_move is not None:
                     return self._format_move(opening_move, config, color)
             
             # Calculate best move
             if config.calculation_depth >= 3 or bot_level >= 7:
                 # Use minimax with alpha-beta for higher levels
-                best_move = self._minimax_move(board, config, color)
+                best_move = self._minimax_move(state, config, color)
             else:
                 # Use simpler evaluation for lower levels
-                best_move = self._evaluate_moves(board, config, color)
+                best_move = self._evaluate_moves(state, config, color)
             
             # Apply error rate (blunder chance)
-            if random.randint(0, 99) < config.error_rate:
-                best_move = self._introduce_error(board, best_move, legal_moves)
+            if self._rng.integers(100) < config.error_rate:
+                best_move = self._introduce_error(state, best_move, legal_moves)
             
             return self._format_move(best_move, config, color)
             
         except Exception as e:
-            logger.error(f"AI move calculation error: {e}")
+            logger.error("AI move calculation error: %s", e)
             # Fallback to random move
-            fallback_move = random.choice(list(chess.Board(board_fen).legal_moves))
-            return self._format_move(fallback_move, config, color)
+            fallback_board = chess.Board(board_fen)
+            fallback_moves = list(fallback_board.legal_moves)
+            fallback_move = fallback_moves[self._rng.integers(len(fallback_moves))]
+            return self._format_move(self._from_chess_move(fallback_board, fallback_move), config, color)
     
-    def _get_opening_move(self, fen: str) -> Optional[str]:
+    def _get_opening_move(self, key: int) -> Optional[int]:
         """Get move from opening book"""
-        if fen in self.opening_book:
-            moves = self.opening_book[fen]
-            return random.choice(moves) if moves else None
-        return None
+        moves = self.opening_book.get(key)
+        return moves[self._rng.integers(len(moves))] if moves else None
+    
+    def _noise(self, scale: float) -> float:
+        """Next uniform(-scale, scale) draw from the pre-drawn buffer"""
+        i = self._noise_i
+        value = self._noise_buf[i] * scale
+        i += 1
+        if i == NOISE_BUFFER_SIZE:
+            self._noise_buf = self._rng.uniform(-1, 1, size=NOISE_BUFFER_SIZE).tolist()
+            i = 0
+        self._noise_i = i
+        return value
     
     def _evaluate_moves(
         self,
-        board: chess.Board,
+        board: BitboardState,
         config: BotConfig,
         color: PieceColor,
-    ) -> chess.Move:
+    ) -> int:
         """Evaluate and select best move using simple heuristics"""
-        legal_moves = list(board.legal_moves)
+        legal_moves = board.legal_moves()
+        is_white = color == "WHITE"
+        
+        # One-ply bots ignore checks, so every move can be scored in one batch
+        if config.calculation_depth == 1:
+            scores = self._batch_move_scores(board, legal_moves, is_white, config)
+            return legal_moves[int(scores.argmax())]
+        
         best_move = legal_moves[0]
         best_score = float('-inf')
-        
-        is_white = color == PieceColor.WHITE
+        noise_scale = config.aggression / 10
         
         for move in legal_moves:
             score = self._evaluate_move(board, move, is_white, config)
             
             # Add some randomness based on aggression
-            randomness = random.uniform(-config.aggression / 10, config.aggression / 10)
-            score += randomness
+            score += self._noise(noise_scale)
             
             if score > best_score:
                 best_score = score
@@ -163,44 +274,248 @@ class AIService:
         
         return best_move
     
+    def _batch_move_scores(
+        self,
+        board: BitboardState,
+        legal_moves: List[int],
+        is_white: bool,
+        config: BotConfig,
+    ) -> np.ndarray:
+        """Score all moves like _evaluate_move, minus the check bonus, with noise added"""
+        moves = np.array(legal_moves, dtype=np.int64)
+        from_squares = moves & 63
+        to_squares = (moves >> 6) & 63
+        
+        squares = np.array(board.squares, dtype=np.int64)
+        pieces = squares[from_squares]
+        captured = squares[to_squares]
+        
+        # Capture value (en passant lands on an empty square and scores nothing, as before)
+        scores = np.where(captured >= 0, PIECE_VALUES[captured % 6 + 1] * 10, 0.0)
+        
+        # Destination square from the AI side's table
+        rows = pieces % 6 if is_white else pieces % 6 + 6
+        scores += PSQT[rows, to_squares] / 100.0
+        
+        # Aggression bonus for moves into ranks 5-8
+        if config.aggression > 50:
+            scores += (to_squares >= 32) * (config.aggression / 20)
+        
+        scale = config.aggression / 10
+        scores += self._rng.uniform(-scale, scale, size=len(legal_moves))
+        return scores
+    
     def _minimax_move(
         self,
-        board: chess.Board,
+        board: BitboardState,
         config: BotConfig,
         color: PieceColor,
-    ) -> chess.Move:
-        """Calculate best move using minimax with alpha-beta pruning"""
-        depth = min(config.calculation_depth, 4)  # Cap at 4 for performance
-        is_white = color == PieceColor.WHITE
-        
-        _, best_move = self._minimax(
-            board,
-            depth,
-            float('-inf'),
-            float('inf'),
-            is_white,
-            config,
-        )
+    ) -> int:
+        """Calculate best move using iteratively deepened minimax with alpha-beta pruning"""
+        is_white = color == "WHITE"
+        self._killers = [(0, 0)] * MAX_SEARCH_DEPTH
+        deadline = time.monotonic() + SEARCH_TIME_BUDGET
+        root_ply = self._root_ply = board.ply
+        best_move = None
         
-        return best_move or list(board.legal_moves)[0]
+        # Each iteration stores its best root move in the TT, so the next,
+        # deeper iteration searches that move first
+        for depth in range(1, config.calculation_depth + 1):
+            # Depth 1 always completes so there is a move to return
+            self._deadline = deadline if best_move is not None else float('inf')
+            try:
+                score, move = self._minimax(
+                    board,
+                    depth,
+                    float('-inf'),
+                    float('inf'),
+                    is_white,
+                    config,
+                )
+            except _SearchTimeout:
+                while board.ply > root_ply:
+                    board.pop()
+                break
+            
+            if move is not None:
+                best_move = move
+            if abs(score) > MATE_THRESHOLD:
+                break
+        
+        return best_move if best_move is not None else board.legal_moves()[0]
     
     def _minimax(
         self,
-        board: chess.Board,
+        board: BitboardState,
         depth: int,
         alpha: float,
         beta: float,
         maximizing: bool,
         config: BotConfig,
-    ) -> Tuple[float, Optional[chess.Move]]:
-        """Minimax algorithm with alpha-beta pruning"""
-        if depth == 0 or board.is_game_over():
-            return self._evaluate_board(board, config), None
+    ) -> Tuple[float, Optional[int]]:
+        """Minimax algorithm with alpha-beta pruning and a transposition table"""
+        if time.monotonic() > self._deadline:
+            raise _SearchTimeout
+        
+        # The root still needs a move, so only positions below it are scored as draws
+        ply = board.ply - self._root_ply
+        if ply and self._is_draw(board):
+            return 0.0, None
+        
+        if depth == 0:
+            return self._qsearch(board, alpha, beta, maximizing, config, QSEARCH_MAX_DEPTH), None
+        
+        # Reuse a stored result searched at least this deep, or tighten the window with its bound.
+        # Scores depend on which side maximizes (the requested color), so that is part of the key.
+        key = (board.key << 1) | maximizing
+        entry = self._tt.get(key)
+        tt_move = entry[3] if entry is not None else None
+        if entry is not None and entry[0] >= depth:
+            tt_score = _score_from_tt(entry[1], ply)
+            tt_flag = entry[2]
+            if tt_flag == TT_EXACT:
+                return tt_score, tt_move
+            if tt_flag == TT_LOWER:
+                alpha = max(alpha, tt_score)
+            else:
+                beta = min(beta, tt_score)
+            if beta <= alpha:
+                return tt_score, tt_move
+        
+        legal_moves = board.legal_moves()
+        if not legal_moves:
+            return self._terminal_score(board), None
+        
+        self._order_moves(board, legal_moves, tt_move, depth)
+        score, best_move = self._search_moves(board, legal_moves, depth, alpha, beta, maximizing, config)
+        
+        if score <= alpha:
+            flag = TT_UPPER
+        elif score >= beta:
+            flag = TT_LOWER
+        else:
+            flag = TT_EXACT
+        
+        tt = self._tt
+        tt[key] = (depth, _score_to_tt(score, ply), flag, best_move)
+        if len(tt) > TT_MAX_ENTRIES:
+            tt.popitem(last=False)
+        
+        return score, best_move
+    
+    def _qsearch(
+        self,
+        board: BitboardState,
+        alpha: float,
+        beta: float,
+        maximizing: bool,
+        config: BotConfig,
+        depth: int,
+    ) -> float:
+        """Extend leaves through capture sequences so they are scored once quiet"""
+        if time.monotonic() > self._deadline:
+            raise _SearchTimeout
         
-        legal_moves = list(board.legal_moves)
+        # Captures reset the 50-move clock and cannot repeat a position, leaving
+        # only material draws to find here (the caller checked the rest)
+        if board.is_insufficient_material():
+            return 0.0
+        
+        legal_moves = board.legal_moves()
         if not legal_moves:
-            return self._evaluate_board(board, config), None
+            return self._terminal_score(board)
+        
+        stand_pat = self._evaluate_board(board, config, len(legal_moves))
+        if maximizing:
+            if stand_pat >= beta:
+                return beta
+            alpha = max(alpha, stand_pat)
+        else:
+            if stand_pat <= alpha:
+                return alpha
+            beta = min(beta, stand_pat)
+        
+        captures = [move for move in legal_moves if board.is_capture(move)]
+        if depth == 0 or not captures:
+            return alpha if maximizing else beta
         
+        self._order_moves(board, captures, None, 0)
+        for move in captures:
+            board.push(move)
+            score = self._qsearch(board, alpha, beta, not maximizing, config, depth - 1)
+            board.pop()
+            
+            if maximizing:
+                if score >= beta:
+                    return beta
+                alpha = max(alpha, score)
+            else:
+                if score <= alpha:
+                    return alpha
+                beta = min(beta, score)
+        
+        return alpha if maximizing else beta
+    
+    def _terminal_score(self, board: BitboardState) -> float:
+        """Score a position with no legal moves"""
+        if not board.in_check():  # Stalemate
+            return 0.0
+        # Checkmate; counting plies from the root makes nearer mates score higher
+        mate = MATE_SCORE - (board.ply - self._root_ply)
+        return -mate if board.turn == 0 else mate
+    
+    def _is_draw(self, board: BitboardState) -> bool:
+        """Draw by insufficient material, threefold repetition or the 50-move rule"""
+        if board.is_insufficient_material() or board.is_repetition():
+            return True
+        # Checkmate delivered on the 50th move still stands
+        return board.is_fifty_moves() and not (board.in_check() and not board.legal_moves())
+    
+    def _order_moves(
+        self,
+        board: BitboardState,
+        moves: List[int],
+        tt_move: Optional[int],
+        depth: int,
+    ):
+        """Sort moves in place: TT move, then captures by MVV-LVA, then killers"""
+        squares = board.squares
+        killer_1, killer_2 = self._killers[depth]
+        
+        def priority(move: int) -> int:
+            if move == tt_move:
+                return 10000
+            victim = squares[(move >> 6) & 63]
+            if victim >= 0 or board.is_capture(move):  # is_capture covers en passant
+                attacker = squares[move & 63] % 6 + 1
+                return 10 * ORDER_VALUES[victim % 6 + 1 if victim >= 0 else 1] - ORDER_VALUES[attacker]
+            if move == killer_1:
+                return 1000
+            if move == killer_2:
+                return 999
+            return 0
+        
+        moves.sort(key=priority, reverse=True)
+    
+    def _store_killer(self, board: BitboardState, move: int, depth: int):
+        """Remember a quiet move that caused a beta cutoff at this depth"""
+        if board.is_capture(move):
+            return
+        killer_1, _ = self._killers[depth]
+        if move != killer_1:
+            self._killers[depth] = (move, killer_1)
+    
+    def _search_moves(
+        self,
+        board: BitboardState,
+        legal_moves: List[int],
+        depth: int,
+        alpha: float,
+        beta: float,
+        maximizing: bool,
+        config: BotConfig,
+    ) -> Tuple[float, int]:
+        """Alpha-beta loop over the moves of one node"""
         best_move = legal_moves[0]
         
         if maximizing:
@@ -216,6 +531,7 @@ class AIService:
                 
                 alpha = max(alpha, eval_score)
                 if beta <= alpha:
+                    self._store_killer(board, move, depth)
                     break
             
             return max_eval, best_move
@@ -232,171 +548,162 @@ class AIService:
                 
                 beta = min(beta, eval_score)
                 if beta <= alpha:
+                    self._store_killer(board, move, depth)
                     break
             
             return min_eval, best_move
     
     def _evaluate_move(
         self,
-        board: chess.Board,
-        move: chess.Move,
+        board: BitboardState,
+        move: int,
         is_white: bool,
         config: BotConfig,
     ) -> float:
         """Evaluate a single move"""
         score = 0.0
+        from_square, to_square = move & 63, (move >> 6) & 63
         
         # Check for captures
-        if board.is_capture(move):
-            captured_piece = board.piece_at(move.to_square)
-            if captured_piece:
-                score += self._get_piece_value(captured_piece.piece_type) * 10
+        captured_piece = board.squares[to_square]
+        if captured_piece >= 0:
+            score += self._get_piece_value(captured_piece % 6 + 1) * 10
         
         # Check for checks
         board.push(move)
-        if board.is_check():
+        if board.in_check():
             score += 5
         board.pop()
         
         # Position evaluation
-        to_piece = board.piece_at(move.from_square)
-        if to_piece:
-            score += self._evaluate_position(to_piece.piece_type, move.to_square, is_white)
+        to_piece = board.squares[from_square]
+        if to_piece >= 0:
+            score += self._evaluate_position(to_piece % 6 + 1, to_square, is_white)
         
         # Aggression bonus for attacking moves
-        if config.aggression > 50:
-            if move.to_square in [s for s in chess.SQUARES if chess.square_rank(s) >= 4]:
-                score += config.aggression / 20
+        aggression = config.aggression
+        if aggression > 50:
+            if (1 << to_square) & _HIGH_RANK_MASK:
+                score += aggression / 20
         
         return score
     
-    def _evaluate_board(self, board: chess.Board, config: BotConfig) -> float:
-        """Evaluate entire board position"""
-        score = 0.0
-        
-        for square in chess.SQUARES:
-            piece = board.piece_at(square)
-            if piece:
-                piece_value = self._get_piece_value(piece.piece_type)
-                position_value = self._evaluate_position(piece.piece_type, square, piece.color == chess.WHITE)
-                
-                if piece.color == chess.WHITE:
-                    score += piece_value + position_value
-                else:
-                    score -= piece_value + position_value
+    def _evaluate_board(
+        self,
+        board: BitboardState,
+        config: BotConfig,
+        mobility: Optional[int] = None,
+    ) -> float:
+        """Evaluate entire board position, given the side to move's legal move count if known"""
+        if NUMBA_AVAILABLE:
+            bbs = self._bbs_buf
+            bbs[:] = board.bbs
+            score = eval_board(bbs, PSQT, PIECE_VALUES)
+        else:
+            score = self._evaluate_material(board)
         
         # Mobility bonus
-        white_mobility = len(list(board.legal_moves))
-        score += white_mobility * 0.1 if board.turn == chess.WHITE else -white_mobility * 0.1
+        if mobility is None:
+            mobility = len(board.legal_moves())
+        score += mobility * 0.1 if board.turn == 0 else -mobility * 0.1
+        
+        return score
+    
+    def _evaluate_material(self, board: BitboardState) -> float:
+        """Material and position score, white minus black (pure Python path)"""
+        score = 0.0
+        
+        # Walk only occupied squares, one piece bitboard at a time
+        for idx, bb in enumerate(board.bbs):
+            if not bb:
+                continue
+            
+            position_values = PSQT_VALUES[idx]
+            piece_score = self._get_piece_value(idx % 6 + 1) * bb.bit_count()
+            while bb:
+                lsb = bb & -bb
+                piece_score += position_values[lsb.bit_length() - 1]
+                bb ^= lsb
+            
+            score += piece_score if idx < 6 else -piece_score
         
         return score
     
     def _evaluate_position(
         self,
-        piece_type: chess.PieceType,
-        square: chess.Square,
+        piece_type: "chess.PieceType",
+        square: "chess.Square",
         is_white: bool,
     ) -> float:
         """Evaluate piece position on board"""
-        file = chess.square_file(square)
-        rank = chess.square_rank(square)
-        
-        # Center control bonus
-        center_bonus = 0
-        if 2 <= file <= 5 and 2 <= rank <= 5:
-            center_bonus = 0.5
-        
-        # Piece-specific positioning
-        position_score = center_bonus
-        
-        if piece_type == chess.PAWN:
-            # Pawns prefer advancing
-            position_score += rank * 0.1 if is_white else (7 - rank) * 0.1
-        elif piece_type == chess.KNIGHT:
-            # Knights prefer center
-            position_score += 0.2 if 2 <= file <= 5 else 0
-        elif piece_type == chess.BISHOP:
-            # Bishops prefer long diagonals
-            position_score += 0.15
-        elif piece_type == chess.ROOK:
-            # Rooks prefer open files and 7th rank
-            if rank == 6 if is_white else rank == 1:
-                position_score += 0.3
-        elif piece_type == chess.QUEEN:
-            # Queen prefers center and mobility
-            position_score += 0.1
-        
-        return position_score
+        return PSQT_VALUES[piece_type - 1 if is_white else piece_type + 5][square]
     
-    def _get_piece_value(self, piece_type: chess.PieceType) -> float:
+    def _get_piece_value(self, piece_type: "chess.PieceType") -> float:
         """Get standard piece values"""
-        values = {
-            chess.PAWN: 1.0,
-            chess.KNIGHT: 3.0,
-            chess.BISHOP: 3.0,
-            chess.ROOK: 5.0,
-            chess.QUEEN: 9.0,
-            chess.KING: 100.0,
-        }
-        return values.get(piece_type, 0)
+        return _PIECE_VALUES[piece_type] if PAWN <= piece_type <= KING else 0
     
     def _introduce_error(
         self,
-        board: chess.Board,
-        best_move: chess.Move,
-        legal_moves: List[chess.Move],
-    ) -> chess.Move:
+        board: BitboardState,
+        best_move: int,
+        legal_moves: List[int],
+    ) -> int:
         """Introduce occasional suboptimal moves"""
         if len(legal_moves) <= 1:
             return best_move
         
         # Pick a random non-best move
         other_moves = [m for m in legal_moves if m != best_move]
-        return random.choice(other_moves)
+        return other_moves[self._rng.integers(len(other_moves))]
     
     def _format_move(
         self,
-        move: chess.Move,
+        move: int,
         config: BotConfig,
         color: PieceColor,
-    ) -> Dict[str, Any]:
-        """Format move for API response"""
-        from_file = chess.square_file(move.from_square)
-        from_rank = chess.square_rank(move.from_square)
-        to_file = chess.square_file(move.to_square)
-        to_rank = chess.square_rank(move.to_square)
-        
-        result = {
-            "piece_id": 0,  # Would be set by game state
-            "from": {"file": from_file, "rank": from_rank},
-            "to": {"file": to_file, "rank": to_rank},
-            "is_special": move.promotion is not None or self._is_castle(move),
-            "bot_level": config.level,
-            "calculation_time_ms": random.randint(100, 500),
-        }
-        
-        if move.promotion:
-            result["promotion"] = self._chess_piece_to_type(move.promotion)
-        
-        if self._is_castle(move):
-            result["special_data"] = "CASTLE_KING" if move.to_square > move.from_square else "CASTLE_QUEEN"
+    ) -> AIMoveOut:
+        """Format a packed move for API response"""
+        from_square, to_square = move & 63, (move >> 6) & 63
+        from_pos = Position(file=sq_file(from_square), rank=sq_rank(from_square))
+        to_pos = Position(file=sq_file(to_square), rank=sq_rank(to_square))
+        promotion = move_promotion(move)
+        is_castle = self._is_castle(move)
         
-        return result
+        return AIMoveOut(
+            piece_id=0,  # Would be set by game state
+            from_=from_pos,
+            to=to_pos,
+            is_special=bool(promotion) or is_castle,
+            special_data=("CASTLE_KING" if to_square > from_square else "CASTLE_QUEEN") if is_castle else None,
+            bot_level=config.level,
+            calculation_time_ms=int(self._rng.integers(100, 501)),
+            promotion=self._chess_piece_to_type(promotion) if promotion else None,
+        )
+    
+    def _from_chess_move(self, board: "chess.Board", move: "chess.Move") -> int:
+        """Pack a chess.Move, reading its castling/en passant kind off the board"""
+        if board.is_castling(move):
+            flag = MOVE_CASTLING
+        elif board.is_en_passant(move):
+            flag = MOVE_EN_PASSANT
+        else:
+            flag = MOVE_NORMAL
+        return encode_move(move.from_square, move.to_square, move.promotion or 0, flag)
     
-    def _is_castle(self, move: chess.Move) -> bool:
+    def _is_castle(self, move: int) -> bool:
         """Check if move is castling"""
-        return abs(chess.square_file(move.to_square) - chess.square_file(move.from_square)) == 2
+        return move >> 14 == MOVE_CASTLING
     
-    def _chess_piece_to_type(self, piece_type: chess.PieceType) -> PieceType:
+    def _chess_piece_to_type(self, piece_type: "chess.PieceType") -> PieceType:
         """Convert chess library piece type to our PieceType"""
         mapping = {
-            chess.PAWN: PieceType.PAWN,
-            chess.KNIGHT: PieceType.KNIGHT,
-            chess.BISHOP: PieceType.BISHOP,
-            chess.ROOK: PieceType.ROOK,
-            chess.QUEEN: PieceType.QUEEN,
+            PAWN: "PAWN",
+            KNIGHT: "KNIGHT",
+            BISHOP: "BISHOP",
+            ROOK: "ROOK",
+            QUEEN: "QUEEN",
         }
-        return mapping.get(piece_type, PieceType.PAWN)
+        return mapping.get(piece_type, "PAWN")
     
     async def generate_ghost_move(
         self,
@@ -404,12 +711,12 @@ class AIService:
         piece_id: int,
         board_fen: str,
         ghost_config: Dict[str, Any],
-    ) -> Dict[str, Any]:
+    ) -> Union[AIMoveOut, Dict[str, Any]]:
         """Generate autonomous ghost piece move with Giza proof"""
         move_data = await self.get_move(
             board_fen=board_fen,
             bot_level=ghost_config.get("level", 5),
-            color=PieceColor.BLACK,
+            color="BLACK",
             game_context={"game_id": game_id, "piece_id": piece_id},
         )
         
@@ -417,6 +724,7 @@ class AIService:
             # In production, generate verifiable proof via Giza
             # proof = await self.giza_client.generate_proof(move_data)
             # move_data["proof"] = proof
-            move_data["verifiable"] = True
+            if isinstance(move_data, AIMoveOut):
+                move_data = msgspec.structs.replace(move_data, verifiable=True)
         
         return move_data
@@ -0,0 +1,662 @@
+"""
+Bitboard - Magic-bitboard board representation and move generation for the AI search
+"""
+
+from dataclasses import dataclass, field
+from typing import List, Tuple
+import numpy as np
+
+# Squares, piece types and colors use python-chess numbering so boards convert 1:1
+SQUARES = list(range(64))
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(1, 7)
+WHITE, BLACK = 0, 1
+
+FULL = (1 << 64) - 1
+RANK_1 = 0xFF
+RANK_8 = RANK_1 << 56
+
+# Castling right bits
+CASTLE_WK, CASTLE_WQ, CASTLE_BK, CASTLE_BQ = 1, 2, 4, 8
+
+# Move kinds, stored in the top two bits of a packed move
+MOVE_NORMAL, MOVE_PROMOTION, MOVE_EN_PASSANT, MOVE_CASTLING = 0, 1, 2, 3
+
+# Fixed-shift magics: index = ((occupancy & mask) * magic) >> (64 - bits)
+ROOK_BITS = 12
+BISHOP_BITS = 9
+
+ROOK_MAGIC = (
+    0x1080001040008021, 0x8140002000401000, 0x0A600480804A0020, 0x1001048046100010,
+    0x0100080081000E02, 0x4020020005000488, 0x0E400E0002408100, 0x0200005021020884,
+    0x1018804000108000, 0x8088010408004040, 0x020024005000051A, 0x0026045800021001,
+    0x4005500404420010, 0x0629000104000604, 0x10021008100100C0, 0x0151200080402002,
+    0x9208100204001040, 0x0104420800482500, 0x0104002000080005, 0x8801080080080040,
+    0x0100802804020018, 0x1000021045000400, 0x80401001092201C0, 0x18000B0802040100,
+    0x0100200060001000, 0x229028180E21030A, 0x003020000A140048, 0x0100470250029000,
+    0x40E0044220080311, 0x4000020080040080, 0x2040800080010002, 0x4C20C061C0024040,
+    0x1004021820080120, 0x108021000A00A200, 0x00000D1002808608, 0x05100E0002040004,
+    0x4100602140040220, 0x0000014101400981, 0x0000020020400490, 0x00C90000A2500580,
+    0x0000102200200810, 0x4004184810064000, 0x8020004401082020, 0x5110001AC5010010,
+    0x0010036102401080, 0x00018080082C2C00, 0x0420080102004294, 0x0004408108002801,
+    0x00042CA00A180008, 0x600010A006504810, 0x0116014800900410, 0x4100080004004040,
+    0x2000802101406120, 0x01C0040600080090, 0x88C0180092441290, 0x8000800080401060,
+    0x020A1100E1800041, 0x00A8408110090022, 0x0000200100C01511, 0x108020080200410E,
+    0x8022900804200102, 0x0080102082040841, 0x0283040220209221, 0x0280004114008022,
+)
+
+BISHOP_MAGIC = (
+    0x0600418460140C44, 0x0005080029400400, 0x0002008210044000, 0x4438400442000441,
+    0x00022010ED040010, 0x0080440A11000C24, 0x4002800911090200, 0x004042080081880C,
+    0x3150301009880C0A, 0x1000020014008A84, 0x2008126222821400, 0x4080011404022001,
+    0x1401112008061002, 0x40000B0940200060, 0x0080B04414010108, 0x0200800C00401501,
+    0x8010E00088940180, 0x0224100801001200, 0x5808091000081004, 0x0000420400408800,
+    0x0402081008026000, 0x90E0200840104009, 0x230620800A100608, 0x1121101004110482,
+    0x0020004004096830, 0x020044048D458040, 0x000031C001000C00, 0x004004020A020848,
+    0x0A05001125004000, 0x0011001000801000, 0x020100400C020060, 0x141280101A010880,
+    0x0020640206300023, 0x4082B12020108121, 0x2A01080080010430, 0x0C00400A00002200,
+    0x4004040400301100, 0x800021020000C050, 0x280A018028500424, 0x8008440828010140,
+    0x0405040040040400, 0x2102008020580500, 0xF902010878010040, 0x8008D20710111080,
+    0x0400184324000208, 0x0842002101208040, 0x00A442102200E081, 0x0828904120040601,
+    0x000A00A1004200C0, 0x0000281A02004040, 0x80045004080C1800, 0x04402000D0802020,
+    0x008018010100A01C, 0x0000814801A10000, 0x090C0810200A0240, 0x0205100200109500,
+    0x0429010802008200, 0x000B00B008001090, 0x00692000102C0434, 0x0180000140114800,
+    0x040C809122180202, 0x0004004208004440, 0x000020009000808C, 0x000A0C0220D00862,
+)
+
+
+_ROOK_DIRS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+_BISHOP_DIRS = ((1, 1), (1, -1), (-1, 1), (-1, -1))
+
+
+def _slide(sq: int, occ: int, dirs) -> int:
+    """Attacks of a slider on sq, stopping at the first blocker in each direction"""
+    attacks = 0
+    f0, r0 = sq & 7, sq >> 3
+    for df, dr in dirs:
+        f, r = f0 + df, r0 + dr
+        while 0 <= f < 8 and 0 <= r < 8:
+            s = r * 8 + f
+            attacks |= 1 << s
+            if occ >> s & 1:
+                break
+            f += df
+            r += dr
+    return attacks
+
+
+def _relevant_mask(sq: int, dirs) -> int:
+    """Occupancy bits that can block a slider on sq (board edges excluded)"""
+    mask = 0
+    f0, r0 = sq & 7, sq >> 3
+    for df, dr in dirs:
+        f, r = f0 + df, r0 + dr
+        while 0 <= f + df < 8 and 0 <= r + dr < 8:
+            mask |= 1 << (r * 8 + f)
+            f += df
+            r += dr
+    return mask
+
+
+def _step_attacks(sq: int, deltas) -> int:
+    """Attacks of a leaper on sq"""
+    attacks = 0
+    f0, r0 = sq & 7, sq >> 3
+    for df, dr in deltas:
+        f, r = f0 + df, r0 + dr
+        if 0 <= f < 8 and 0 <= r < 8:
+            attacks |= 1 << (r * 8 + f)
+    return attacks
+
+
+def _build_slider_table(magics, dirs, bits) -> Tuple[List[int], List[List[int]]]:
+    """Enumerate every blocker subset per square and file its attacks under the magic index"""
+    masks = []
+    tables = []
+    shift = 64 - bits
+    for sq in range(64):
+        mask = _relevant_mask(sq, dirs)
+        magic = magics[sq]
+        table = [0] * (1 << bits)
+        subset = 0
+        while True:  # Carry-rippler walk over all subsets of mask
+            table[((subset * magic) & FULL) >> shift] = _slide(sq, subset, dirs)
+            subset = (subset - mask) & mask
+            if not subset:
+                break
+        masks.append(mask)
+        tables.append(table)
+    return masks, tables
+
+
+ROOK_MASKS, ROOK_ATTACKS = _build_slider_table(ROOK_MAGIC, _ROOK_DIRS, ROOK_BITS)
+BISHOP_MASKS, BISHOP_ATTACKS = _build_slider_table(BISHOP_MAGIC, _BISHOP_DIRS, BISHOP_BITS)
+
+KNIGHT_ATTACKS = [
+    _step_attacks(sq, ((1, 2), (2, 1), (2, -1), (1, -2), (-1, -2), (-2, -1), (-2, 1), (-1, 2)))
+    for sq in range(64)
+]
+KING_ATTACKS = [
+    _step_attacks(sq, ((1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1)))
+    for sq in range(64)
+]
+# PAWN_ATTACKS[color][sq]: squares a pawn of that color on sq attacks
+PAWN_ATTACKS = (
+    [_step_attacks(sq, ((-1, 1), (1, 1))) for sq in range(64)],
+    [_step_attacks(sq, ((-1, -1), (1, -1))) for sq in range(64)],
+)
+
+# Rights kept after a move touches a square (king/rook origin or rook capture)
+_CASTLE_KEEP = [0xF] * 64
+_CASTLE_KEEP[4] &= ~(CASTLE_WK | CASTLE_WQ)
+_CASTLE_KEEP[7] &= ~CASTLE_WK
+_CASTLE_KEEP[0] &= ~CASTLE_WQ
+_CASTLE_KEEP[60] &= ~(CASTLE_BK | CASTLE_BQ)
+_CASTLE_KEEP[63] &= ~CASTLE_BK
+_CASTLE_KEEP[56] &= ~CASTLE_BQ
+
+_PROMOTIONS = (QUEEN, ROOK, BISHOP, KNIGHT)
+_PROMOTION_BITS = tuple(((promo - KNIGHT) << 12) | (MOVE_PROMOTION << 14) for promo in _PROMOTIONS)
+_EN_PASSANT_BITS = MOVE_EN_PASSANT << 14
+_CASTLING_BITS = MOVE_CASTLING << 14
+
+# FEN byte -> bitboard index (-1 for anything that is not a piece letter)
+_FEN_PIECE_INDEX = [-1] * 128
+for _i, _c in enumerate(b"PNBRQKpnbrqk"):
+    _FEN_PIECE_INDEX[_c] = _i
+
+# FEN castling byte -> right bit
+_FEN_CASTLING = {ord("K"): 1, ord("Q"): 2, ord("k"): 4, ord("q"): 8}
+
+STARTING_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+# Light and dark squares (a1 is dark)
+LIGHT_SQUARES = 0x55AA55AA55AA55AA
+DARK_SQUARES = 0xAA55AA55AA55AA55
+
+# Zobrist keys (fixed seed so keys are stable across processes)
+_zobrist_rng = np.random.default_rng(0xC0FFEE)
+ZOBRIST_PIECES = _zobrist_rng.integers(0, 2**64, size=(12, 64), dtype=np.uint64, endpoint=False).tolist()
+ZOBRIST_CASTLING = _zobrist_rng.integers(0, 2**64, size=16, dtype=np.uint64, endpoint=False).tolist()
+ZOBRIST_EP_FILE = _zobrist_rng.integers(0, 2**64, size=8, dtype=np.uint64, endpoint=False).tolist()
+ZOBRIST_BLACK = int(_zobrist_rng.integers(0, 2**64, dtype=np.uint64, endpoint=False))
+
+
+def rook_attacks(sq: int, occ: int) -> int:
+    """Rook attacks from sq given board occupancy"""
+    return ROOK_ATTACKS[sq][(((occ & ROOK_MASKS[sq]) * ROOK_MAGIC[sq]) & FULL) >> (64 - ROOK_BITS)]
+
+
+def bishop_attacks(sq: int, occ: int) -> int:
+    """Bishop attacks from sq given board occupancy"""
+    return BISHOP_ATTACKS[sq][(((occ & BISHOP_MASKS[sq]) * BISHOP_MAGIC[sq]) & FULL) >> (64 - BISHOP_BITS)]
+
+
+def _build_line_tables() -> Tuple[List[List[int]], List[List[int]]]:
+    """Squares strictly between, and the full line through, every aligned square pair"""
+    between = [[0] * 64 for _ in range(64)]
+    line = [[0] * 64 for _ in range(64)]
+    for a in range(64):
+        for b in range(64):
+            if a == b:
+                continue
+            for attacks in (rook_attacks, bishop_attacks):
+                if attacks(a, 0) >> b & 1:
+                    between[a][b] = attacks(a, 1 << b) & attacks(b, 1 << a)
+                    line[a][b] = (attacks(a, 0) & attacks(b, 0)) | (1 << a) | (1 << b)
+    return between, line
+
+
+BETWEEN, LINE = _build_line_tables()
+
+
+def square_file(sq: int) -> int:
+    """File index (0-7, a-h) of a square"""
+    return sq & 7
+
+
+def square_rank(sq: int) -> int:
+    """Rank index (0-7, 1-8) of a square"""
+    return sq >> 3
+
+
+def encode_move(frm: int, to: int, promo: int = 0, flag: int = MOVE_NORMAL) -> int:
+    """Pack a move into 16 bits: from (6) | to (6) | promotion piece - KNIGHT (2) | kind (2)"""
+    if promo:
+        return frm | (to << 6) | ((promo - KNIGHT) << 12) | (MOVE_PROMOTION << 14)
+    return frm | (to << 6) | (flag << 14)
+
+
+def move_promotion(move: int) -> int:
+    """Promotion piece type of a packed move, or 0"""
+    return ((move >> 12) & 3) + KNIGHT if move >> 14 == MOVE_PROMOTION else 0
+
+
+def move_uci(move: int) -> str:
+    """UCI string for a packed move"""
+    frm, to, promo = move & 63, (move >> 6) & 63, move_promotion(move)
+    uci = "%s%d%s%d" % ("abcdefgh"[frm & 7], (frm >> 3) + 1, "abcdefgh"[to & 7], (to >> 3) + 1)
+    return uci + " pnbrqk"[promo] if promo else uci
+
+
+@dataclass(slots=True)
+class BitboardState:
+    """Board as 12 piece bitboards plus a mailbox, with push/pop via an undo stack"""
+    bbs: List[int]  # index color * 6 + piece_type - 1
+    squares: List[int]  # square -> bitboard index, or -1 if empty
+    turn: int = WHITE
+    castling: int = 0
+    ep_square: int = -1
+    halfmove_clock: int = 0
+    fullmove_number: int = 1
+    occ: List[int] = field(default_factory=lambda: [0, 0])  # per color
+    key: int = 0  # Zobrist hash, updated incrementally by push/pop
+    _undo: list = field(default_factory=list)
+
+    def __post_init__(self):
+        self.occ = [
+            self.bbs[0] | self.bbs[1] | self.bbs[2] | self.bbs[3] | self.bbs[4] | self.bbs[5],
+            self.bbs[6] | self.bbs[7] | self.bbs[8] | self.bbs[9] | self.bbs[10] | self.bbs[11],
+        ]
+        self.key = self.compute_key()
+
+    def compute_key(self) -> int:
+        """Zobrist hash from scratch"""
+        key = ZOBRIST_CASTLING[self.castling]
+        for square, piece in enumerate(self.squares):
+            if piece >= 0:
+                key ^= ZOBRIST_PIECES[piece][square]
+        if self.turn == BLACK:
+            key ^= ZOBRIST_BLACK
+        return key ^ self._ep_key()
+
+    def _ep_key(self) -> int:
+        """Zobrist term for the en passant file, hashed only when a pawn could capture there"""
+        # An uncapturable ep square does not change the position (repetition rules agree)
+        ep, us = self.ep_square, self.turn
+        if ep >= 0 and PAWN_ATTACKS[us ^ 1][ep] & self.bbs[us * 6]:
+            return ZOBRIST_EP_FILE[ep & 7]
+        return 0
+
+    @classmethod
+    def from_board(cls, board) -> "BitboardState":
+        """Build from a python-chess Board"""
+        bbs = [0] * 12
+        squares = [-1] * 64
+        for color, c in ((True, WHITE), (False, BLACK)):
+            for pt in range(PAWN, KING + 1):
+                mask = int(board.pieces_mask(pt, color))
+                bbs[c * 6 + pt - 1] = mask
+                while mask:
+                    lsb = mask & -mask
+                    squares[lsb.bit_length() - 1] = c * 6 + pt - 1
+                    mask ^= lsb
+
+        rights = board.castling_rights
+        castling = (
+            (CASTLE_WK if rights & (1 << 7) else 0)
+            | (CASTLE_WQ if rights & 1 else 0)
+            | (CASTLE_BK if rights & (1 << 63) else 0)
+            | (CASTLE_BQ if rights & (1 << 56) else 0)
+        )
+        ep = board.ep_square if board.ep_square is not None else -1
+
+        return cls(
+            bbs, squares, WHITE if board.turn else BLACK, castling, ep,
+            board.halfmove_clock, board.fullmove_number,
+        )
+
+    @classmethod
+    def from_fen(cls, fen: str) -> "BitboardState":
+        """Decode a FEN directly with byte arithmetic, without building a chess.Board"""
+        fields = fen.split()
+        if len(fields) < 4:
+            raise ValueError("Invalid FEN: %r" % fen)
+        placement, side, rights, ep = fields[0].encode(), fields[1], fields[2].encode(), fields[3]
+
+        bbs = [0] * 12
+        squares = [-1] * 64
+        rank, file = 7, 0
+        for c in placement:
+            if c == 47:  # '/'
+                if file != 8 or rank == 0:
+                    raise ValueError("Invalid FEN: %r" % fen)
+                rank -= 1
+                file = 0
+            elif 49 <= c <= 56:  # '1'-'8'
+                file += c - 48
+            else:
+                idx = _FEN_PIECE_INDEX[c] if c < 128 else -1
+                if idx < 0 or file > 7:
+                    raise ValueError("Invalid FEN: %r" % fen)
+                sq = rank * 8 + file
+                bbs[idx] |= 1 << sq
+                squares[sq] = idx
+                file += 1
+            if file > 8:
+                raise ValueError("Invalid FEN: %r" % fen)
+        if rank != 0 or file != 8 or bbs[KING - 1].bit_count() != 1 or bbs[KING + 5].bit_count() != 1:
+            raise ValueError("Invalid FEN: %r" % fen)
+
+        if side not in ("w", "b"):
+            raise ValueError("Invalid FEN: %r" % fen)
+
+        castling = 0
+        if rights != b"-":
+            for c in rights:
+                bit = _FEN_CASTLING.get(c)
+                if bit is None:
+                    raise ValueError("Invalid FEN: %r" % fen)
+                castling |= bit
+
+        ep_square = -1
+        if ep != "-":
+            if len(ep) != 2 or not "a" <= ep[0] <= "h" or ep[1] not in "36":
+                raise ValueError("Invalid FEN: %r" % fen)
+            ep_square = (ord(ep[0]) - 97) + (ord(ep[1]) - 49) * 8
+
+        halfmove_clock = int(fields[4]) if len(fields) > 4 else 0
+        fullmove_number = int(fields[5]) if len(fields) > 5 else 1
+
+        return cls(bbs, squares, WHITE if side == "w" else BLACK, castling, ep_square, halfmove_clock, fullmove_number)
+
+    @property
+    def ply(self) -> int:
+        """Half-moves played since the start of the game"""
+        return 2 * (self.fullmove_number - 1) + self.turn
+
+    def king_square(self, color: int) -> int:
+        return self.bbs[color * 6 + KING - 1].bit_length() - 1
+
+    def is_attacked(self, sq: int, by: int) -> bool:
+        """Whether side `by` attacks sq"""
+        return self._attacked(sq, by, self.occ[0] | self.occ[1])
+
+    def _attacked(self, sq: int, by: int, occ: int) -> bool:
+        """Whether side `by` attacks sq, with sliders blocked by occ"""
+        bbs = self.bbs
+        b = by * 6
+        if KNIGHT_ATTACKS[sq] & bbs[b + 1] or KING_ATTACKS[sq] & bbs[b + 5]:
+            return True
+        if PAWN_ATTACKS[by ^ 1][sq] & bbs[b]:
+            return True
+        queens = bbs[b + 4]
+        if rook_attacks(sq, occ) & (bbs[b + 3] | queens):
+            return True
+        return bool(bishop_attacks(sq, occ) & (bbs[b + 2] | queens))
+
+    def in_check(self) -> bool:
+        """Whether the side to move is in check"""
+        return self.is_attacked(self.king_square(self.turn), self.turn ^ 1)
+
+    def is_fifty_moves(self) -> bool:
+        """Whether 50 moves have passed without a capture or pawn move"""
+        return self.halfmove_clock >= 100
+
+    def is_repetition(self, count: int = 3) -> bool:
+        """Whether the position has occurred count times in the pushed history"""
+        # Only positions since the last capture or pawn move, with the same side to move, can match
+        key = self.key
+        undo = self._undo
+        seen = 1
+        for back in range(2, min(self.halfmove_clock, len(undo)) + 1, 2):
+            if undo[-back][7] == key:
+                seen += 1
+                if seen >= count:
+                    return True
+        return False
+
+    def is_insufficient_material(self) -> bool:
+        """Whether neither side has mating material (bare kings, one minor, or same-colored bishops)"""
+        bbs = self.bbs
+        if bbs[0] | bbs[3] | bbs[4] | bbs[6] | bbs[9] | bbs[10]:  # Pawns, rooks, queens
+            return False
+        knights = bbs[1] | bbs[7]
+        bishops = bbs[2] | bbs[8]
+        if (knights | bishops).bit_count() <= 1:
+            return True
+        return not knights and (not bishops & LIGHT_SQUARES or not bishops & DARK_SQUARES)
+
+    def is_capture(self, move: int) -> bool:
+        return self.squares[(move >> 6) & 63] >= 0 or move >> 14 == MOVE_EN_PASSANT
+
+    def push(self, move: int):
+        """Make a move, recording what pop() needs to undo it"""
+        frm, to, kind = move & 63, (move >> 6) & 63, move >> 14
+        bbs, squares, occ = self.bbs, self.squares, self.occ
+        us = self.turn
+        them = us ^ 1
+        piece = squares[frm]
+        captured = squares[to]
+        cap_sq = to
+
+        if kind == MOVE_EN_PASSANT:
+            cap_sq = to - 8 if us == WHITE else to + 8
+            captured = squares[cap_sq]
+
+        self._undo.append((move, piece, captured, cap_sq, self.castling, self.ep_square, self.halfmove_clock, self.key))
+        key = self.key ^ ZOBRIST_BLACK ^ ZOBRIST_CASTLING[self.castling] ^ self._ep_key()
+
+        if captured >= 0:
+            cap_bit = 1 << cap_sq
+            bbs[captured] ^= cap_bit
+            occ[them] ^= cap_bit
+            squares[cap_sq] = -1
+            key ^= ZOBRIST_PIECES[captured][cap_sq]
+
+        move_bits = (1 << frm) | (1 << to)
+        occ[us] ^= move_bits
+        squares[frm] = -1
+        if kind == MOVE_PROMOTION:
+            placed = us * 6 + ((move >> 12) & 3) + KNIGHT - 1
+            bbs[piece] ^= 1 << frm
+            bbs[placed] |= 1 << to
+        else:
+            placed = piece
+            bbs[piece] ^= move_bits
+        squares[to] = placed
+        key ^= ZOBRIST_PIECES[piece][frm] ^ ZOBRIST_PIECES[placed][to]
+
+        if kind == MOVE_CASTLING:  # Bring the rook across
+            rook_from, rook_to = (frm + 3, frm + 1) if to > frm else (frm - 4, frm - 1)
+            rook = us * 6 + ROOK - 1
+            rook_bits = (1 << rook_from) | (1 << rook_to)
+            bbs[rook] ^= rook_bits
+            occ[us] ^= rook_bits
+            squares[rook_from] = -1
+            squares[rook_to] = rook
+            key ^= ZOBRIST_PIECES[rook][rook_from] ^ ZOBRIST_PIECES[rook][rook_to]
+
+        self.castling &= _CASTLE_KEEP[frm] & _CASTLE_KEEP[to]
+        self.ep_square = (frm + to) >> 1 if piece == us * 6 and abs(to - frm) == 16 else -1
+        self.halfmove_clock = 0 if captured >= 0 or piece == us * 6 else self.halfmove_clock + 1
+        self.fullmove_number += us
+        self.turn = them
+        self.key = key ^ ZOBRIST_CASTLING[self.castling] ^ self._ep_key()
+
+    def pop(self):
+        """Undo the last pushed move"""
+        move, piece, captured, cap_sq, castling, ep_square, halfmove_clock, key = self._undo.pop()
+        frm, to = move & 63, (move >> 6) & 63
+        bbs, squares, occ = self.bbs, self.squares, self.occ
+        them = self.turn
+        us = them ^ 1
+
+        placed = squares[to]
+        bbs[placed] ^= 1 << to
+        bbs[piece] |= 1 << frm
+        occ[us] ^= (1 << frm) | (1 << to)
+        squares[to] = -1
+        squares[frm] = piece
+
+        if captured >= 0:
+            cap_bit = 1 << cap_sq
+            bbs[captured] |= cap_bit
+            occ[them] |= cap_bit
+            squares[cap_sq] = captured
+
+        if move >> 14 == MOVE_CASTLING:
+            rook_from, rook_to = (frm + 3, frm + 1) if to > frm else (frm - 4, frm - 1)
+            rook = us * 6 + ROOK - 1
+            rook_bits = (1 << rook_from) | (1 << rook_to)
+            bbs[rook] ^= rook_bits
+            occ[us] ^= rook_bits
+            squares[rook_to] = -1
+            squares[rook_from] = rook
+
+        self.castling = castling
+        self.ep_square = ep_square
+        self.halfmove_clock = halfmove_clock
+        self.key = key
+        self.fullmove_number -= us
+        self.turn = us
+
+    def pseudo_legal_moves(self) -> List[int]:
+        """Moves that obey piece movement but may leave the king in check"""
+        moves = []
+        append = moves.append
+        bbs = self.bbs
+        us = self.turn
+        them = us ^ 1
+        own = self.occ[us]
+        enemy = self.occ[them]
+        occ = own | enemy
+        empty = ~occ & FULL
+        b = us * 6
+
+        # Pawns
+        pawns = bbs[b]
+        if us == WHITE:
+            single = (pawns << 8) & empty
+            double = ((single & (RANK_1 << 16)) << 8) & empty
+            push, last_rank = 8, RANK_8
+        else:
+            single = (pawns >> 8) & empty
+            double = ((single & (RANK_1 << 40)) >> 8) & empty
+            push, last_rank = -8, RANK_1
+
+        while single:
+            lsb = single & -single
+            to = lsb.bit_length() - 1
+            single ^= lsb
+            if lsb & last_rank:
+                for promo_bits in _PROMOTION_BITS:
+                    append((to - push) | (to << 6) | promo_bits)
+            else:
+                append((to - push) | (to << 6))
+        while double:
+            lsb = double & -double
+            to = lsb.bit_length() - 1
+            double ^= lsb
+            append((to - 2 * push) | (to << 6))
+
+        ep_square = self.ep_square
+        if ep_square >= 0:
+            # Our pawns that attack the en passant square are those it attacks as an enemy pawn
+            attackers = PAWN_ATTACKS[them][ep_square] & pawns
+            while attackers:
+                lsb = attackers & -attackers
+                attackers ^= lsb
+                append((lsb.bit_length() - 1) | (ep_square << 6) | _EN_PASSANT_BITS)
+
+        pawn_attacks = PAWN_ATTACKS[us]
+        while pawns:
+            lsb = pawns & -pawns
+            frm = lsb.bit_length() - 1
+            pawns ^= lsb
+            hits = pawn_attacks[frm] & enemy
+            while hits:
+                hit = hits & -hits
+                to = hit.bit_length() - 1
+                hits ^= hit
+                if hit & last_rank:
+                    for promo_bits in _PROMOTION_BITS:
+                        append(frm | (to << 6) | promo_bits)
+                else:
+                    append(frm | (to << 6))
+
+        # Pieces
+        not_own = ~own & FULL
+        for pt in (KNIGHT, BISHOP, ROOK, QUEEN, KING):
+            pieces = bbs[b + pt - 1]
+            while pieces:
+                lsb = pieces & -pieces
+                frm = lsb.bit_length() - 1
+                pieces ^= lsb
+                if pt == KNIGHT:
+                    attacks = KNIGHT_ATTACKS[frm]
+                elif pt == BISHOP:
+                    attacks = bishop_attacks(frm, occ)
+                elif pt == ROOK:
+                    attacks = rook_attacks(frm, occ)
+                elif pt == QUEEN:
+                    attacks = rook_attacks(frm, occ) | bishop_attacks(frm, occ)
+                else:
+                    attacks = KING_ATTACKS[frm]
+                attacks &= not_own
+                while attacks:
+                    hit = attacks & -attacks
+                    attacks ^= hit
+                    append(frm | ((hit.bit_length() - 1) << 6))
+
+        # Castling (the king may not start in, pass through or land in check)
+        rights = self.castling >> (2 * us) & 3
+        if rights:
+            k = 4 if us == WHITE else 60
+            if rights & 1 and not occ & (0b11 << (k + 1)) and not self.is_attacked(k, them) \
+                    and not self.is_attacked(k + 1, them) and not self.is_attacked(k + 2, them):
+                append(k | ((k + 2) << 6) | _CASTLING_BITS)
+            if rights & 2 and not occ & (0b111 << (k - 3)) and not self.is_attacked(k, them) \
+                    and not self.is_attacked(k - 1, them) and not self.is_attacked(k - 2, them):
+                append(k | ((k - 2) << 6) | _CASTLING_BITS)
+
+        return moves
+
+    def _is_safe(self, move: int) -> bool:
+        """Whether a move leaves our king unattacked, checked by making it"""
+        us = self.turn
+        self.push(move)
+        safe = not self.is_attacked(self.king_square(us), us ^ 1)
+        self.pop()
+        return safe
+
+    def legal_moves(self) -> List[int]:
+        """Pseudo-legal moves filtered to those that do not leave our king attacked"""
+        moves = self.pseudo_legal_moves()
+        bbs = self.bbs
+        us = self.turn
+        them = us ^ 1
+        king = self.king_square(us)
+        occ = self.occ[0] | self.occ[1]
+
+        if self._attacked(king, them, occ):  # In check: rare, so just try each move
+            return [move for move in moves if self._is_safe(move)]
+
+        # Own pieces alone between our king and an enemy slider may only move along that line
+        b = them * 6
+        queens = bbs[b + 4]
+        snipers = (rook_attacks(king, 0) & (bbs[b + 3] | queens)) | (bishop_attacks(king, 0) & (bbs[b + 2] | queens))
+        own = self.occ[us]
+        pinned = 0
+        while snipers:
+            lsb = snipers & -snipers
+            snipers ^= lsb
+            blockers = BETWEEN[king][lsb.bit_length() - 1] & occ
+            if blockers & own and not blockers & (blockers - 1):
+                pinned |= blockers
+
+        king_line = LINE[king]
+        occ_without_king = occ ^ (1 << king)
+        legal = []
+        for move in moves:
+            frm, to = move & 63, (move >> 6) & 63
+            if frm == king:
+                # Castling was fully checked during generation
+                if move >> 14 == MOVE_CASTLING or not self._attacked(to, them, occ_without_king):
+                    legal.append(move)
+            elif move >> 14 == MOVE_EN_PASSANT:
+                # En passant removes two pieces from the rank; test it directly
+                if self._is_safe(move):
+                    legal.append(move)
+            elif not pinned >> frm & 1 or king_line[frm] >> to & 1:
+                legal.append(move)
+        return legal
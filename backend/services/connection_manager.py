@@ -0,0 +1,109 @@
+"""
+Connection Manager - Fans out game events to WebSocket subscribers in batches
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Set
+import orjson
+from fastapi import WebSocket
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionManager:
+    """Per-game subscriber sets with a single batching broadcaster per game"""
+
+    # Maximum events coalesced into one frame
+    BATCH_SIZE = 32
+
+    # How long to wait for more events before flushing a batch
+    BATCH_WINDOW = 0.005  # seconds
+
+    def __init__(self):
+        self.connections: Dict[int, Set[WebSocket]] = {}
+        self.queues: Dict[int, asyncio.Queue] = {}
+        self._tasks: Dict[int, asyncio.Task] = {}
+
+    async def connect(self, game_id: int, websocket: WebSocket):
+        """Subscribe a socket to a game, starting its broadcaster if needed"""
+        self.connections.setdefault(game_id, set()).add(websocket)
+
+        if game_id not in self._tasks:
+            self.queues[game_id] = asyncio.Queue()
+            self._tasks[game_id] = asyncio.create_task(self._broadcaster(game_id))
+
+    def disconnect(self, game_id: int, websocket: WebSocket):
+        """Unsubscribe a socket, stopping the broadcaster when none remain"""
+        sockets = self.connections.get(game_id)
+        if sockets is None:
+            return
+
+        sockets.discard(websocket)
+        if not sockets:
+            del self.connections[game_id]
+            self.queues.pop(game_id, None)
+            task = self._tasks.pop(game_id, None)
+            if task:
+                task.cancel()
+
+    def publish(self, game_id: int, event: Dict[str, Any]):
+        """Queue an event for a game; dropped if nobody is subscribed"""
+        queue = self.queues.get(game_id)
+        if queue is not None:
+            queue.put_nowait(event)
+
+    async def _next_batch(self, queue: asyncio.Queue) -> List[Dict[str, Any]]:
+        """Wait for one event, then collect more until the batch fills or the window closes"""
+        batch = [await queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.BATCH_WINDOW
+
+        while len(batch) < self.BATCH_SIZE:
+            if not queue.empty():
+                batch.append(queue.get_nowait())
+                continue
+
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _broadcaster(self, game_id: int):
+        """Drain a game's queue, encode each batch once and send it to every subscriber"""
+        queue = self.queues[game_id]
+
+        while True:
+            batch = await self._next_batch(queue)
+            payload = orjson.dumps(batch)
+
+            sockets = list(self.connections.get(game_id, ()))
+            results = await asyncio.gather(
+                *(ws.send_bytes(payload) for ws in sockets),
+                return_exceptions=True,
+            )
+
+            for ws, result in zip(sockets, results):
+                if isinstance(result, Exception):
+                    logger.warning("Dropping subscriber of game %s: %s", game_id, result)
+                    self.disconnect(game_id, ws)
+
+    async def shutdown(self):
+        """Cancel all broadcaster tasks"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        self._tasks.clear()
+        self.queues.clear()
+        self.connections.clear()
+
+
+# Shared instance used by the WebSocket endpoint and the game routes
+connection_manager = ConnectionManager()
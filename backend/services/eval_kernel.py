@@ -0,0 +1,73 @@
+"""
+Eval Kernel - Compiled static evaluation over piece bitboards
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:  # numba is optional; callers fall back to a Python loop
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit"""
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+# Material by piece type (index 0 unused, 1-6 = pawn..king)
+PIECE_VALUES = np.array([0.0, 1.0, 3.0, 3.0, 5.0, 9.0, 100.0], dtype=np.float64)
+
+
+def _build_psqt() -> np.ndarray:
+    """Positional bonus in centipawns per (color * 6 + piece_type - 1, square)"""
+    psqt = np.zeros((12, 64), dtype=np.int8)
+    for idx in range(12):
+        is_white = idx < 6
+        piece_type = idx % 6 + 1
+        for square in range(64):
+            file, rank = square & 7, square >> 3
+            
+            # Center control bonus
+            score = 50 if 2 <= file <= 5 and 2 <= rank <= 5 else 0
+            
+            if piece_type == 1:  # Pawns prefer advancing
+                score += 10 * rank if is_white else 10 * (7 - rank)
+            elif piece_type == 2:  # Knights prefer center
+                score += 20 if 2 <= file <= 5 else 0
+            elif piece_type == 3:  # Bishops prefer long diagonals
+                score += 15
+            elif piece_type == 4:  # Rooks prefer the 7th rank
+                score += 30 if rank == (6 if is_white else 1) else 0
+            elif piece_type == 5:  # Queen prefers center and mobility
+                score += 10
+            
+            psqt[idx, square] = score
+    return psqt
+
+
+PSQT = _build_psqt()
+
+# The same table in pawns as nested lists, for lookups from interpreted code
+PSQT_VALUES = (PSQT / 100.0).tolist()
+
+
+@njit(cache=True)
+def eval_board(bbs, psqt, values):
+    """Material plus PSQT for uint64[12] piece bitboards, white minus black"""
+    score = 0.0
+    one = np.uint64(1)
+    for idx in range(12):
+        bb = bbs[idx]
+        if bb == 0:
+            continue
+        
+        piece_score = 0.0
+        for square in range(64):
+            if (bb >> np.uint64(square)) & one:
+                piece_score += values[idx % 6 + 1] + psqt[idx, square] / 100.0
+        
+        score += piece_score if idx < 6 else -piece_score
+    return score
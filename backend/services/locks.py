@@ -0,0 +1,17 @@
+"""
+Lock Stripes - Per-key asyncio locks for serializing in-memory store mutations
+"""
+
+import asyncio
+from typing import Hashable
+
+
+# Number of lock stripes (power of two so the stripe is a bit mask)
+LOCK_STRIPES = 64
+
+_locks = [asyncio.Lock() for _ in range(LOCK_STRIPES)]
+
+
+def lock_for(key: Hashable) -> asyncio.Lock:
+    """Get the lock stripe guarding a key (owner address, game ID, ...)"""
+    return _locks[hash(key) & (LOCK_STRIPES - 1)]
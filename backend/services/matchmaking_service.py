@@ -3,33 +3,37 @@ Matchmaking Service - Handles player matchmaking and queue management
 """
 
 import asyncio
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 from dataclasses import dataclass, field
+import heapq
+import itertools
 import logging
-import random
+import time
+import numpy as np
+from sortedcontainers import SortedKeyList
 
-from models.schemas import OpponentType, MatchmakingRequest, MatchFound, QueueStatus, PieceColor
+from models.schemas import OpponentType, MatchmakingRequest, MatchFound, QueueStatus
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class QueuedPlayer:
     """Player waiting in matchmaking queue"""
     player_address: str
     elo: int
     preferred_opponent: OpponentType
-    queued_at: datetime
+    queued_at: float = field(default_factory=time.monotonic)  # monotonic seconds
     min_elo: int = 0
     max_elo: int = 3000
+    bot_fallback: Optional[asyncio.TimerHandle] = field(default=None, repr=False, compare=False)
     
-    def wait_time(self) -> float:
-        """Get time waiting in seconds"""
-        return (datetime.utcnow() - self.queued_at).total_seconds()
+    def wait_time(self, now: float) -> float:
+        """Get time waiting in seconds as of a time.monotonic() reading"""
+        return now - self.queued_at
 
 
-@dataclass
+@dataclass(slots=True)
 class MatchResult:
     """Result of a matchmaking attempt"""
     player1: str
@@ -52,43 +56,60 @@ class MatchmakingService:
     
     # ELO range expansion rate
     ELO_EXPAND_RATE = 50  # additional ELO per expansion
+    ELO_EXPAND_INTERVAL = 10  # seconds between expansions
+    
+    # Wait for a human before matching an ANY player with a bot
+    BOT_FALLBACK_WAIT = 10  # seconds
     
     def __init__(self):
-        # Queue organized by opponent type
-        self.human_queue: Dict[int, QueuedPlayer] = {}  # elo -> player
-        self.ai_queue: Dict[int, QueuedPlayer] = {}
-        self.any_queue: Dict[int, QueuedPlayer] = {}
+        # Queue organized by opponent type, each kept sorted by ELO
+        self.human_queue: SortedKeyList = SortedKeyList(key=lambda p: p.elo)
+        self.ai_queue: SortedKeyList = SortedKeyList(key=lambda p: p.elo)
+        self.any_queue: SortedKeyList = SortedKeyList(key=lambda p: p.elo)
+        self._queues_by_name: Dict[OpponentType, SortedKeyList] = {
+            "HUMAN": self.human_queue,
+            "AI": self.ai_queue,
+            "ANY": self.any_queue,
+        }
         
         # Player lookup by address
-        self.player_lookup: Dict[str, int] = {}  # address -> elo bucket
+        self.player_lookup: Dict[str, QueuedPlayer] = {}
+        
+        # Min-heap of (monotonic time, seq, player, repeats): when a player's
+        # match prospects next change. Repeating entries mark ELO range expansions.
+        self._deadlines: List[Tuple[float, int, QueuedPlayer, bool]] = []
+        self._deadline_seq = itertools.count()
+        
+        # Set on enqueue so the matchmaking loop runs without waiting for a deadline
+        self._wake = asyncio.Event()
+        
+        # ANY players whose bot fallback timer fired, awaiting their bot match
+        self._bot_fallbacks: List[QueuedPlayer] = []
         
         # Active matches
         self.active_games: Dict[int, MatchResult] = {}
         
-        # Bot configurations
-        self.bot_configs = self._init_bot_configs()
+        # Player address -> game ID of their latest match (bots are not indexed)
+        self.player_to_game: Dict[str, int] = {}
+        
+        # Game ID sequence, seeded from the clock so IDs stay unique across restarts
+        self._game_id_seq = itertools.count(int(time.time() * 1000))
         
-        # Lock for thread safety
-        self._lock = asyncio.Lock()
+        # Bot difficulty table as parallel columns; level N is row N-1
+        self.bot_elos = np.array([400, 600, 800, 1000, 1200, 1400, 1600, 1800, 2000, 2200], dtype=np.int32)
+        self.bot_aggression = np.array([10, 15, 20, 25, 30, 35, 40, 45, 50, 55], dtype=np.int32)
+        self.bot_error_rate = np.array([30, 25, 20, 15, 12, 10, 8, 6, 4, 2], dtype=np.int32)
+        
+        # One lock per queue, so work on one queue never blocks another
+        self._queue_locks: Dict[OpponentType, asyncio.Lock] = {
+            "HUMAN": asyncio.Lock(),
+            "AI": asyncio.Lock(),
+            "ANY": asyncio.Lock(),
+        }
         
         # Background task for matchmaking
         self._match_task: Optional[asyncio.Task] = None
         
-    def _init_bot_configs(self) -> Dict[int, Dict]:
-        """Initialize bot difficulty configurations"""
-        return {
-            1: {"elo": 400, "aggression": 10, "error_rate": 30},
-            2: {"elo": 600, "aggression": 15, "error_rate": 25},
-            3: {"elo": 800, "aggression": 20, "error_rate": 20},
-            4: {"elo": 1000, "aggression": 25, "error_rate": 15},
-            5: {"elo": 1200, "aggression": 30, "error_rate": 12},
-            6: {"elo": 1400, "aggression": 35, "error_rate": 10},
-            7: {"elo": 1600, "aggression": 40, "error_rate": 8},
-            8: {"elo": 1800, "aggression": 45, "error_rate": 6},
-            9: {"elo": 2000, "aggression": 50, "error_rate": 4},
-            10: {"elo": 2200, "aggression": 55, "error_rate": 2},
-        }
-    
     async def start(self):
         """Start the matchmaking service"""
         self._match_task = asyncio.create_task(self._matchmaking_loop())
@@ -106,27 +127,41 @@ class MatchmakingService:
     
     async def queue_player(self, request: MatchmakingRequest) -> QueueStatus:
         """Add a player to the matchmaking queue"""
-        async with self._lock:
+        # Re-queueing replaces the earlier entry rather than leaving it orphaned
+        previous = self.player_lookup.get(request.player)
+        if previous is not None:
+            async with self._queue_locks[previous.preferred_opponent]:
+                self._dequeue(previous)
+        
+        # Only the target queue is locked; the other queues keep matching
+        async with self._queue_locks[request.preferred_opponent]:
             # Determine which queue to use
             queue = self._get_queue(request.preferred_opponent)
             
-            # Create ELO bucket (round to nearest 100)
-            elo_bucket = round(request.player_elo / 100) * 100
-            
             player = QueuedPlayer(
                 player_address=request.player,
                 elo=request.player_elo,
                 preferred_opponent=request.preferred_opponent,
-                queued_at=datetime.utcnow(),
                 min_elo=request.min_elo,
                 max_elo=request.max_elo,
             )
             
             # Add to queue
-            queue[elo_bucket] = player
-            self.player_lookup[request.player] = elo_bucket
+            queue.add(player)
+            self.player_lookup[request.player] = player
             
-            logger.info(f"Player {request.player} queued (ELO: {request.player_elo})")
+            # Try to match on the next pass, then again whenever the range widens
+            now = player.queued_at
+            self._schedule(now, player)
+            if request.preferred_opponent != "AI":
+                self._schedule(now + self.MAX_WAIT_EXPAND_TIME + self.ELO_EXPAND_INTERVAL, player, repeats=True)
+            if request.preferred_opponent == "ANY":
+                player.bot_fallback = asyncio.get_running_loop().call_later(
+                    self.BOT_FALLBACK_WAIT, self._fallback_to_bot, player,
+                )
+            self._wake.set()
+            
+            logger.info("Player %s queued (ELO: %s)", request.player, request.player_elo)
             
             return QueueStatus(
                 is_queued=True,
@@ -137,61 +172,38 @@ class MatchmakingService:
     
     async def cancel_queue(self, player_address: str) -> bool:
         """Remove a player from the matchmaking queue"""
-        async with self._lock:
-            if player_address not in self.player_lookup:
+        player = self.player_lookup.get(player_address)
+        if player is None:
+            return False
+        
+        async with self._queue_locks[player.preferred_opponent]:
+            # Matched while we waited for the lock
+            if self.player_lookup.get(player_address) is not player:
                 return False
             
-            elo_bucket = self.player_lookup[player_address]
-            
-            # Remove from all queues
-            for queue in [self.human_queue, self.ai_queue, self.any_queue]:
-                queue.pop(elo_bucket, None)
-            
-            del self.player_lookup[player_address]
-            logger.info(f"Player {player_address} left queue")
+            self._dequeue(player)
+            logger.info("Player %s left queue", player_address)
             
             return True
     
     async def get_queue_status(self, player_address: str) -> Optional[QueueStatus]:
         """Get current queue status for a player"""
-        if player_address not in self.player_lookup:
+        # Read-only and never awaits, so it sees a consistent snapshot without the lock
+        player = self.player_lookup.get(player_address)
+        if player is None:
             return None
         
-        async with self._lock:
-            elo_bucket = self.player_lookup[player_address]
-            
-            # Find player in queues
-            player = None
-            queue_type = OpponentType.ANY
-            
-            for queue_name, queue in [
-                ("human", self.human_queue),
-                ("ai", self.ai_queue),
-                ("any", self.any_queue),
-            ]:
-                if elo_bucket in queue:
-                    player = queue[elo_bucket]
-                    queue_type = OpponentType(queue_name)
-                    break
-            
-            if not player:
-                return None
-            
-            return QueueStatus(
-                is_queued=True,
-                queue_position=self._get_queue_position(player),
-                estimated_wait_seconds=self._estimate_wait_time(queue_type),
-                preferred_opponent=queue_type,
-            )
+        # A looked-up player is always in the queue for its preferred opponent
+        return QueueStatus(
+            is_queued=True,
+            queue_position=self._get_queue_position(player),
+            estimated_wait_seconds=self._estimate_wait_time(player.preferred_opponent),
+            preferred_opponent=player.preferred_opponent,
+        )
     
-    def _get_queue(self, opponent_type: OpponentType) -> Dict[int, QueuedPlayer]:
+    def _get_queue(self, opponent_type: OpponentType) -> SortedKeyList:
         """Get the appropriate queue for opponent type"""
-        if opponent_type == OpponentType.HUMAN:
-            return self.human_queue
-        elif opponent_type == OpponentType.AI:
-            return self.ai_queue
-        else:
-            return self.any_queue
+        return self._queues_by_name.get(opponent_type, self.any_queue)
     
     def _get_queue_position(self, player: QueuedPlayer) -> int:
         """Calculate player's position in queue"""
@@ -199,10 +211,10 @@ class MatchmakingService:
         queue = self._get_queue(player.preferred_opponent)
         position = 1
         
-        for elo_bucket, queued in queue.items():
-            if abs(elo_bucket - player.elo) <= self.ELO_RANGE:
-                if queued.queued_at < player.queued_at:
-                    position += 1
+        # Only the ELO window is visited; raw ELO replaces the old 100-point buckets
+        for queued in queue.irange_key(player.elo - self.ELO_RANGE, player.elo + self.ELO_RANGE):
+            if queued.queued_at < player.queued_at:
+                position += 1
         
         return position
     
@@ -220,84 +232,136 @@ class MatchmakingService:
         else:
             return 60
     
+    def _schedule(self, when: float, player: QueuedPlayer, repeats: bool = False):
+        """Queue a match attempt for a player at a monotonic time"""
+        heapq.heappush(self._deadlines, (when, next(self._deadline_seq), player, repeats))
+    
+    def _expanded_range(self, player: QueuedPlayer, now: float) -> int:
+        """ELO range for a player, widened the longer they wait"""
+        wait_time = player.wait_time(now)
+        if wait_time <= self.MAX_WAIT_EXPAND_TIME:
+            return self.ELO_RANGE
+        expansions = int((wait_time - self.MAX_WAIT_EXPAND_TIME) / self.ELO_EXPAND_INTERVAL)
+        return self.ELO_RANGE + expansions * self.ELO_EXPAND_RATE
+    
+    def _dequeue(self, player: QueuedPlayer):
+        """Remove a matched player from its queue and the lookup"""
+        self._get_queue(player.preferred_opponent).discard(player)
+        self.player_lookup.pop(player.player_address, None)
+        if player.bot_fallback is not None:
+            player.bot_fallback.cancel()
+    
+    def _fallback_to_bot(self, player: QueuedPlayer):
+        """Timer callback: hand an ANY player still waiting for a human to a bot"""
+        # Callbacks run between task steps, and queue lock holders never await
+        # mid-update, so the queue is consistent here without the lock
+        if self.player_lookup.get(player.player_address) is not player:
+            return
+        self._dequeue(player)
+        self._bot_fallbacks.append(player)
+        self._wake.set()
+    
     async def _matchmaking_loop(self):
         """Background loop to process matchmaking"""
         while True:
             try:
-                await asyncio.sleep(2)  # Check every 2 seconds
+                # Sleep until an enqueue or the next deadline; an empty queue never wakes
+                timeout = None
+                if self._deadlines:
+                    timeout = max(0.0, self._deadlines[0][0] - time.monotonic())
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
                 await self._process_matches()
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                logger.error(f"Matchmaking loop error: {e}")
+                logger.error("Matchmaking loop error: %s", e)
     
     async def _process_matches(self):
-        """Try to create matches from queued players"""
-        async with self._lock:
-            # Process human queue
-            await self._match_players(self.human_queue, OpponentType.HUMAN)
-            
-            # Process any queue (can match with humans or bots)
-            await self._match_players(self.any_queue, OpponentType.ANY)
-            
-            # Process AI queue (always match with bot)
-            await self._match_ai_players()
+        """Try to match the players whose deadlines have come due"""
+        now = time.monotonic()
+        deadlines = self._deadlines
+        ready: Dict[OpponentType, List[QueuedPlayer]] = {"HUMAN": [], "AI": [], "ANY": []}
+        seen: Set[str] = set()
+        while deadlines and deadlines[0][0] <= now:
+            when, _, player, repeats = heapq.heappop(deadlines)
+            if self.player_lookup.get(player.player_address) is not player:
+                continue  # Matched or left the queue since
+            if repeats:
+                self._schedule(when + self.ELO_EXPAND_INTERVAL, player, repeats=True)
+            if player.player_address in seen:
+                continue
+            seen.add(player.player_address)
+            ready[player.preferred_opponent].append(player)
+        
+        # Phase 1: pair players and take them off the queues; queues are
+        # independent, so each is matched under its own lock
+        pairs: List[Tuple[QueuedPlayer, QueuedPlayer]] = []
+        bot_singles, self._bot_fallbacks = self._bot_fallbacks, []
+        await asyncio.gather(*(
+            self._match_ready(opponent_type, players, now, pairs, bot_singles)
+            for opponent_type, players in ready.items()
+            if players
+        ))
+        
+        # Phase 2: create the games concurrently, outside the queue locks
+        await asyncio.gather(
+            *(self._create_match(player, opponent) for player, opponent in pairs),
+            *(self._create_bot_match(player) for player in bot_singles),
+        )
     
-    async def _match_players(
+    async def _match_ready(
         self,
-        queue: Dict[int, QueuedPlayer],
-        queue_type: OpponentType,
+        opponent_type: OpponentType,
+        players: List[QueuedPlayer],
+        now: float,
+        pairs: List[Tuple[QueuedPlayer, QueuedPlayer]],
+        bot_singles: List[QueuedPlayer],
     ):
-        """Try to match players in a queue"""
-        to_remove = []
-        
-        for elo_bucket, player in list(queue.items()):
-            if player in to_remove:
-                continue
-                
-            # Expand ELO range based on wait time
-            wait_time = player.wait_time()
-            expanded_range = self.ELO_RANGE
-            if wait_time > self.MAX_WAIT_EXPAND_TIME:
-                expansions = int((wait_time - self.MAX_WAIT_EXPAND_TIME) / 10)
-                expanded_range += expansions * self.ELO_EXPAND_RATE
+        """Pair due players from one queue while holding that queue's lock"""
+        async with self._queue_locks[opponent_type]:
+            for player in players:
+                # An earlier player in this pass may already have taken them
+                if self.player_lookup.get(player.player_address) is player:
+                    self._try_match_one(player, now, pairs, bot_singles)
+    
+    def _try_match_one(
+        self,
+        player: QueuedPlayer,
+        now: float,
+        pairs: List[Tuple[QueuedPlayer, QueuedPlayer]],
+        bot_singles: List[QueuedPlayer],
+    ) -> bool:
+        """Dequeue a player with its nearest-ELO neighbour, or for a bot; True if matched"""
+        if player.preferred_opponent != "AI":
+            # The closest opponents in a sorted queue sit right next to the player
+            queue = self._get_queue(player.preferred_opponent)
+            i = queue.index(player)
+            opponent = None
+            for j in (i - 1, i + 1):
+                if 0 <= j < len(queue):
+                    other = queue[j]
+                    gap = abs(other.elo - player.elo)
+                    if gap > max(self._expanded_range(player, now), self._expanded_range(other, now)):
+                        continue
+                    if opponent is None or gap < abs(opponent.elo - player.elo):
+                        opponent = other
             
-            # Find potential match
-            for other_bucket, other_player in list(queue.items()):
-                if other_player == player or other_player in to_remove:
-                    continue
-                
-                # Check ELO compatibility
-                if abs(other_player.elo - player.elo) <= expanded_range:
-                    # Create match
-                    await self._create_match(player, other_player, is_bot=False)
-                    to_remove.extend([player, other_player])
-                    break
+            if opponent is not None:
+                self._dequeue(player)
+                self._dequeue(opponent)
+                pairs.append((player, opponent))
+                return True
             
-            # If no human match and queue_type is ANY, try bot match
-            if queue_type == OpponentType.ANY and player not in to_remove:
-                if player.wait_time() > 10:  # Wait at least 10 seconds for human
-                    await self._create_bot_match(player)
-                    to_remove.append(player)
-        
-        # Remove matched players
-        for player in to_remove:
-            elo_bucket = round(player.elo / 100) * 100
-            queue.pop(elo_bucket, None)
-            self.player_lookup.pop(player.player_address, None)
-    
-    async def _match_ai_players(self):
-        """Match AI queue players with bots immediately"""
-        to_remove = []
+            # ANY players reach a bot through their fallback timer instead
+            return False
         
-        for elo_bucket, player in list(self.ai_queue.items()):
-            await self._create_bot_match(player)
-            to_remove.append(player)
-        
-        for player in to_remove:
-            elo_bucket = round(player.elo / 100) * 100
-            self.ai_queue.pop(elo_bucket, None)
-            self.player_lookup.pop(player.player_address, None)
+        self._dequeue(player)
+        bot_singles.append(player)
+        return True
     
     async def _create_match(
         self,
@@ -314,11 +378,11 @@ class MatchmakingService:
         if player1.elo >= player2.elo:
             white_player = player1.player_address
             black_player = player2.player_address
-            white_color = PieceColor.WHITE
+            white_color = "WHITE"
         else:
             white_player = player2.player_address
             black_player = player1.player_address
-            white_color = PieceColor.BLACK
+            white_color = "BLACK"
         
         match = MatchResult(
             player1=white_player,
@@ -331,14 +395,15 @@ class MatchmakingService:
         )
         
         self.active_games[game_id] = match
+        self.player_to_game[white_player] = game_id
+        self.player_to_game[black_player] = game_id
         
-        logger.info(f"Match created: Game {game_id} - {white_player} vs {black_player}")
+        logger.info("Match created: Game %s - %s vs %s", game_id, white_player, black_player)
     
     async def _create_bot_match(self, player: QueuedPlayer):
         """Create a match between player and bot"""
         # Find appropriate bot level
         bot_level = self._find_bot_level(player.elo)
-        bot_config = self.bot_configs[bot_level]
         
         # Generate game ID
         game_id = self._generate_game_id()
@@ -348,38 +413,41 @@ class MatchmakingService:
             player1=player.player_address,
             player2=f"bot_{bot_level}",
             player1_elo=player.elo,
-            player2_elo=bot_config["elo"],
+            player2_elo=int(self.bot_elos[bot_level - 1]),
             game_id=game_id,
             is_bot_match=True,
             bot_level=bot_level,
         )
         
         self.active_games[game_id] = match
+        self.player_to_game[player.player_address] = game_id
         
-        logger.info(f"Bot match created: Game {game_id} - {player.player_address} vs Bot {bot_level}")
+        logger.info("Bot match created: Game %s - %s vs Bot %s", game_id, player.player_address, bot_level)
     
     def _find_bot_level(self, player_elo: int) -> int:
         """Find appropriate bot level for player's ELO"""
-        # Simple linear mapping
-        level = max(1, min(10, (player_elo - 200) // 200 + 1))
-        return level
+        # One level above the strongest bot the player is rated at or above
+        level = int(np.searchsorted(self.bot_elos, player_elo, side="right")) + 1
+        return min(level, len(self.bot_elos))
     
     def _generate_game_id(self) -> int:
         """Generate unique game ID"""
-        import time
-        return int(time.time() * 1000) % 10000000000
+        return next(self._game_id_seq)
     
     def get_match_result(self, player_address: str) -> Optional[MatchFound]:
         """Get match result for a player if found"""
-        for game_id, match in self.active_games.items():
-            if match.player1 == player_address or match.player2 == player_address:
-                is_white = match.player1 == player_address
-                return MatchFound(
-                    game_id=game_id,
-                    opponent=match.player2 if is_white else match.player1,
-                    opponent_elo=match.player2_elo if is_white else match.player1_elo,
-                    is_bot=match.is_bot_match,
-                    bot_level=match.bot_level,
-                    color=PieceColor.WHITE if is_white else PieceColor.BLACK,
-                )
-        return None
+        game_id = self.player_to_game.get(player_address)
+        if game_id is None:
+            return None
+        
+        match = self.active_games[game_id]
+        is_white = match.player1 == player_address
+        # Built from our own match records, so skip validation
+        return MatchFound.model_construct(
+            game_id=game_id,
+            opponent=match.player2 if is_white else match.player1,
+            opponent_elo=match.player2_elo if is_white else match.player1_elo,
+            is_bot=match.is_bot_match,
+            bot_level=match.bot_level,
+            color="WHITE" if is_white else "BLACK",
+        )
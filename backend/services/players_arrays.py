@@ -0,0 +1,121 @@
+"""
+Players Arrays - Structure-of-Arrays storage for player stats and ELO
+"""
+
+from typing import Dict, List
+import itertools
+import numpy as np
+from sortedcontainers import SortedList
+
+from models.schemas_fast import PlayerStats, ELOData
+
+
+DEFAULT_ELO = 1200
+
+# Range storable in the int32 ELO columns
+ELO_MIN = int(np.iinfo(np.int32).min)
+ELO_MAX = int(np.iinfo(np.int32).max)
+INITIAL_CAPACITY = 1024
+
+
+class PlayerArrays:
+    """Player records stored as parallel int32 columns indexed by slot"""
+
+    # Per-player integer columns, one array each
+    COLUMNS = (
+        "elo_current",
+        "elo_highest",
+        "games_played",
+        "wins",
+        "losses",
+        "draws",
+        "win_streak",
+        "best_win_streak",
+    )
+
+    def __init__(self, capacity: int = INITIAL_CAPACITY):
+        self.addresses: List[str] = []
+        self.idx: Dict[str, int] = {}  # address -> slot
+        self.capacity = capacity
+        
+        # (-elo, slot) kept sorted on write so the leaderboard is a slice
+        self.elo_index = SortedList()
+
+        for column in self.COLUMNS:
+            setattr(self, column, np.zeros(capacity, dtype=np.int32))
+
+    def __len__(self) -> int:
+        return len(self.addresses)
+
+    def __contains__(self, address: str) -> bool:
+        return address in self.idx
+
+    def _grow(self):
+        """Double capacity, copying existing rows"""
+        self.capacity *= 2
+        for column in self.COLUMNS:
+            old = getattr(self, column)
+            new = np.zeros(self.capacity, dtype=np.int32)
+            new[:len(old)] = old
+            setattr(self, column, new)
+
+    def get_or_create(self, address: str) -> int:
+        """Get slot for a player, appending a new row if needed"""
+        i = self.idx.get(address)
+        if i is not None:
+            return i
+
+        i = len(self.addresses)
+        if i == self.capacity:
+            self._grow()
+
+        self.addresses.append(address)
+        self.idx[address] = i
+        self.elo_current[i] = DEFAULT_ELO
+        self.elo_highest[i] = DEFAULT_ELO
+        self.elo_index.add((-DEFAULT_ELO, i))
+        return i
+
+    def set_elo(self, i: int, elo: int):
+        """Set current ELO for a slot, keeping the sorted index in sync"""
+        # Reject before touching the index, so a failed store cannot drop the player
+        if not ELO_MIN <= elo <= ELO_MAX:
+            raise ValueError(f"ELO {elo} out of range [{ELO_MIN}, {ELO_MAX}]")
+        self.elo_index.remove((-int(self.elo_current[i]), i))
+        self.elo_current[i] = elo
+        self.elo_index.add((-elo, i))
+
+    def win_rate(self, i: int) -> float:
+        """Win rate for a single slot"""
+        games = int(self.games_played[i])
+        return int(self.wins[i]) / games if games > 0 else 0.0
+
+    def to_elo(self, i: int) -> ELOData:
+        """Build ELOData view for a slot"""
+        return ELOData(
+            player_address=self.addresses[i],
+            current_elo=int(self.elo_current[i]),
+            highest_elo=int(self.elo_highest[i]),
+            games_played=int(self.games_played[i]),
+            wins=int(self.wins[i]),
+            losses=int(self.losses[i]),
+            draws=int(self.draws[i]),
+            win_streak=int(self.win_streak[i]),
+            best_win_streak=int(self.best_win_streak[i]),
+        )
+
+    def to_stats(self, i: int) -> PlayerStats:
+        """Build PlayerStats view for a slot"""
+        return PlayerStats(
+            address=self.addresses[i],
+            elo=self.to_elo(i),
+            total_games=int(self.games_played[i]),
+            total_wins=int(self.wins[i]),
+            win_rate=self.win_rate(i),
+        )
+
+    def top(self, limit: int) -> np.ndarray:
+        """Slots of the highest-ELO players, best first"""
+        # Ties are ordered by registration (slot) order
+        head = itertools.islice(self.elo_index, max(limit, 0))
+        return np.fromiter((i for _, i in head), dtype=np.intp)
@@ -3,16 +3,51 @@ Starknet Service - Handles blockchain interactions via HTTP
 """
 
 import asyncio
+import functools
+import hashlib
+import itertools
 import logging
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple, Union
 import httpx
+import msgspec
+import orjson
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:  # h2 is optional; the client falls back to HTTP/1.1 keepalive
+    HTTP2_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
+_JSON_HEADERS = {"content-type": "application/json"}
+
+
+class _RpcResponse(msgspec.Struct):
+    """JSON-RPC response object; unknown members such as "jsonrpc" are skipped"""
+    id: Optional[int] = None
+    result: Any = None
+    error: Any = None
+
+
+# A batch answers with an array, or with one object when the whole batch is rejected
+_batch_decoder = msgspec.json.Decoder(Union[List[_RpcResponse], _RpcResponse])
+
+
+@functools.lru_cache(maxsize=256)
+def _selector_hex(name: str) -> str:
+    """Hex entry point selector (felt252) for a function name (simplified)"""
+    # In production, use starknet.keccak
+    hash_bytes = hashlib.sha3_256(name.encode()).digest()
+    return hex(int.from_bytes(hash_bytes[:31], 'big'))
+
 
 class StarknetService:
     """Service for interacting with Starknet blockchain via HTTP RPC"""
     
+    # Calls issued within this window share one JSON-RPC batch POST
+    BATCH_WINDOW = 0.005  # seconds
+    
     def __init__(
         self,
         rpc_url: str = "https://starknet-sepolia.public.blastapi.io",
@@ -20,12 +55,93 @@ class StarknetService:
     ):
         self.rpc_url = rpc_url
         self.contract_address = contract_address
-        self.client = httpx.AsyncClient(timeout=30.0)
+        # Keep connections warm so calls skip the TCP/TLS handshake; HTTP/2
+        # multiplexes concurrent calls over a single connection
+        self.client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_keepalive_connections=32,
+                max_connections=64,
+                keepalive_expiry=300,
+            ),
+            timeout=httpx.Timeout(30.0, connect=5.0),
+        )
+        
+        # Requests waiting for the next batch, and the task that will send them
+        self._pending: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        self._batch_task: Optional[asyncio.Task] = None
+        self._rpc_ids = itertools.count(1)
         
     async def close(self):
         """Close HTTP client"""
+        if self._batch_task is not None:
+            await self._batch_task
         await self.client.aclose()
     
+    async def _rpc(self, method: str, params: List[Any]) -> _RpcResponse:
+        """Send a JSON-RPC request as part of the current batch and return its response object"""
+        payload = {
+            "jsonrpc": "2.0",
+            "id": next(self._rpc_ids),
+            "method": method,
+            "params": params,
+        }
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((payload, future))
+        if self._batch_task is None:
+            self._batch_task = asyncio.create_task(self._flush_batch())
+            self._batch_task.add_done_callback(self._release_unclaimed)
+        return await future
+    
+    async def _flush_batch(self):
+        """Post every request queued during the batch window as one JSON-RPC batch"""
+        batch: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        try:
+            await asyncio.sleep(self.BATCH_WINDOW)
+            batch, self._pending = self._pending, []
+            self._batch_task = None  # Later calls start the next batch
+            
+            # Encode with orjson rather than httpx's stdlib json
+            response = await self.client.post(
+                self.rpc_url,
+                content=orjson.dumps([payload for payload, _ in batch]),
+                headers=_JSON_HEADERS,
+            )
+            response.raise_for_status()
+            # Typed decode straight from the body bytes, skipping intermediate dicts
+            results = _batch_decoder.decode(response.content)
+            if isinstance(results, _RpcResponse):  # Whole batch rejected with a single error
+                for _, future in batch:
+                    if not future.done():  # Caller may have been cancelled
+                        future.set_result(results)
+                return
+            
+            # Batch responses may come back in any order
+            by_id = {result.id: result for result in results}
+            missing = _RpcResponse(error="No response in batch")
+            for payload, future in batch:
+                if not future.done():
+                    future.set_result(by_id.get(payload["id"], missing))
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            # Cancelled mid-request: nobody else will answer these callers
+            for _, future in batch:
+                if not future.done():
+                    future.cancel()
+    
+    def _release_unclaimed(self, task: asyncio.Task):
+        """Cancel callers of a flush that was cancelled before it took the batch"""
+        if self._batch_task is not task:
+            return
+        batch, self._pending = self._pending, []
+        self._batch_task = None
+        for _, future in batch:
+            if not future.done():
+                future.cancel()
+    
     async def call_contract(
         self,
         function_name: str,
@@ -37,95 +153,64 @@ class StarknetService:
         if not addr:
             raise ValueError("Contract address not provided")
         
-        # Convert function name to selector (felt252)
-        selector = self._get_selector_from_name(function_name)
+        # Function names are few and fixed, so selectors are hashed once each
+        selector = _selector_hex(function_name)
         
-        payload = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "starknet_call",
-            "params": [
-                {
-                    "contract_address": addr,
-                    "entry_point_selector": hex(selector),
-                    "calldata": [hex(x) for x in calldata],
-                },
-                "latest"
-            ]
-        }
+        params = [
+            {
+                "contract_address": addr,
+                "entry_point_selector": selector,
+                "calldata": list(map(hex, calldata)),
+            },
+            "latest"
+        ]
         
         try:
-            response = await self.client.post(self.rpc_url, json=payload)
-            response.raise_for_status()
-            result = response.json()
+            result = await self._rpc("starknet_call", params)
             
-            if "error" in result:
-                logger.error(f"Contract call error: {result['error']}")
+            if result.error is not None:
+                logger.error("Contract call error: %s", result.error)
                 return []
             
-            return [int(x, 16) for x in result.get("result", [])]
+            felts = result.result or ()
+            return list(map(int, felts, itertools.repeat(16, len(felts))))
             
         except Exception as e:
-            logger.error(f"Failed to call contract: {e}")
+            logger.error("Failed to call contract: %s", e)
             return []
     
     async def get_transaction_status(self, tx_hash: str) -> Dict[str, Any]:
         """Get transaction status"""
-        payload = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "starknet_getTransactionStatus",
-            "params": [tx_hash]
-        }
-        
         try:
-            response = await self.client.post(self.rpc_url, json=payload)
-            response.raise_for_status()
-            result = response.json()
-            return result.get("result", {})
+            result = await self._rpc("starknet_getTransactionStatus", [tx_hash])
+            return result.result or {}
         except Exception as e:
-            logger.error(f"Failed to get transaction status: {e}")
+            logger.error("Failed to get transaction status: %s", e)
             return {}
     
     async def get_block_number(self) -> int:
         """Get current block number"""
-        payload = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "starknet_blockNumber",
-            "params": []
-        }
-        
         try:
-            response = await self.client.post(self.rpc_url, json=payload)
-            response.raise_for_status()
-            result = response.json()
-            return result.get("result", 0)
+            result = await self._rpc("starknet_blockNumber", [])
+            return result.result or 0
         except Exception as e:
-            logger.error(f"Failed to get block number: {e}")
+            logger.error("Failed to get block number: %s", e)
             return 0
     
-    def _get_selector_from_name(self, name: str) -> int:
-        """Convert function name to selector (simplified)"""
-        # In production, use starknet.keccak
-        import hashlib
-        hash_bytes = hashlib.sha3_256(name.encode()).digest()
-        return int.from_bytes(hash_bytes[:31], 'big')
-    
     # High-level game methods (would be implemented with full starknet.py in production)
     async def create_game(self, player_white: str, config: Dict[str, Any]) -> int:
         """Create a new game - placeholder for production implementation"""
-        logger.info(f"Would create game for {player_white}")
+        logger.info("Would create game for %s", player_white)
         # In production: invoke contract with starknet.py
         return 0
     
     async def join_game(self, game_id: int, player_black: str):
         """Join a game - placeholder"""
-        logger.info(f"Would join game {game_id} as {player_black}")
+        logger.info("Would join game %s as %s", game_id, player_black)
     
     async def make_move(self, game_id: int, move: Dict[str, Any]) -> Dict[str, Any]:
         """Make a move - placeholder"""
-        logger.info(f"Would make move in game {game_id}")
+        logger.info("Would make move in game %s", game_id)
         return {"success": True, "is_capture": False}
     
     async def get_game_state(self, game_id: int) -> Dict[str, Any]:
@@ -0,0 +1,87 @@
+"""
+Tests for bitboard move generation (perft) and incremental Zobrist keys
+"""
+
+import random
+
+import pytest
+
+from services.bitboard import BitboardState, STARTING_FEN, encode_move
+
+
+def perft(board: BitboardState, depth: int) -> int:
+    """Count leaf nodes of the legal move tree"""
+    moves = board.legal_moves()
+    if depth == 1:
+        return len(moves)
+    nodes = 0
+    for move in moves:
+        board.push(move)
+        nodes += perft(board, depth - 1)
+        board.pop()
+    return nodes
+
+
+# Standard perft positions with their published depth-3 node counts
+PERFT_POSITIONS = [
+    (STARTING_FEN, 8902),
+    ("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1", 97862),
+    ("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", 2812),
+    ("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1", 9467),
+    ("rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8", 62379),
+]
+
+
+@pytest.mark.parametrize("fen,nodes", PERFT_POSITIONS)
+def test_perft_depth_3(fen, nodes):
+    """Legal move generation reaches the published node counts"""
+    board = BitboardState.from_fen(fen)
+    key = board.key
+    assert perft(board, 3) == nodes
+    assert board.key == key and board.ply == BitboardState.from_fen(fen).ply
+
+
+@pytest.mark.parametrize("fen", [fen for fen, _ in PERFT_POSITIONS])
+def test_incremental_key_matches_full_hash(fen):
+    """push/pop keep the Zobrist key equal to a from-scratch hash along random games"""
+    rng = random.Random(fen)
+    for _ in range(20):
+        board = BitboardState.from_fen(fen)
+        keys = [board.key]
+        for _ in range(60):
+            moves = board.legal_moves()
+            if not moves:
+                break
+            board.push(rng.choice(moves))
+            assert board.key == board.compute_key()
+            keys.append(board.key)
+
+        # Unwinding restores every earlier key
+        while board._undo:
+            assert board.key == keys.pop()
+            board.pop()
+            assert board.key == board.compute_key()
+        assert board.key == keys.pop()
+
+
+def test_transpositions_share_a_key():
+    """Different move orders reaching the same position hash the same"""
+    def play(moves):
+        board = BitboardState.from_fen(STARTING_FEN)
+        for frm, to in moves:
+            board.push(encode_move(frm, to))
+        return board
+
+    # 1. Nf3 Nf6 2. Nc3 Nc6 versus 1. Nc3 Nc6 2. Nf3 Nf6 (g1=6, f3=21, b1=1, c3=18)
+    first = play([(6, 21), (62, 45), (1, 18), (57, 42)])
+    second = play([(1, 18), (57, 42), (6, 21), (62, 45)])
+    assert first.key == second.key
+
+    # An en passant square only changes the key when a pawn could capture there
+    after_e4 = "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq %s 0 1"
+    pushed = play([(12, 28)])  # 1. e4
+    assert pushed.ep_square == 20
+    assert pushed.key == BitboardState.from_fen(after_e4 % "e3").key == BitboardState.from_fen(after_e4 % "-").key
+
+    capturable = "rnbqkbnr/ppp1pppp/8/8/3pP3/8/PPPP1PPP/RNBQKBNR b KQkq %s 0 1"
+    assert BitboardState.from_fen(capturable % "e3").key != BitboardState.from_fen(capturable % "-").key
@@ -0,0 +1,96 @@
+"""
+Tests for ConnectionManager batched event fan-out
+"""
+
+import asyncio
+
+import orjson
+
+from services.connection_manager import ConnectionManager
+
+
+class FakeSocket:
+    """Records the binary frames sent to it"""
+
+    def __init__(self, fail: bool = False):
+        self.frames = []
+        self.fail = fail
+
+    async def send_bytes(self, data: bytes):
+        if self.fail:
+            raise ConnectionError("socket closed")
+        self.frames.append(data)
+
+
+async def _settle(manager: ConnectionManager):
+    """Give the broadcaster time to flush everything queued"""
+    await asyncio.sleep(manager.BATCH_WINDOW * 4)
+
+
+def test_burst_is_batched_into_shared_frames():
+    """A burst of publishes reaches every subscriber as a few JSON-array frames, encoded once"""
+    async def run():
+        manager = ConnectionManager()
+        first, second = FakeSocket(), FakeSocket()
+        await manager.connect(1, first)
+        await manager.connect(1, second)
+
+        events = [{"type": "move", "game_id": 1, "move_count": n} for n in range(40)]
+        for event in events:
+            manager.publish(1, event)
+        await _settle(manager)
+        await manager.shutdown()
+        return first, second, events
+
+    first, second, events = asyncio.run(run())
+
+    # 40 events fill one batch of BATCH_SIZE and leave the rest for a second frame
+    assert [len(orjson.loads(frame)) for frame in first.frames] == [ConnectionManager.BATCH_SIZE, 8]
+    assert [event for frame in first.frames for event in orjson.loads(frame)] == events
+
+    # Both subscribers were sent the very same encoded bytes
+    assert len(second.frames) == len(first.frames)
+    assert all(a is b for a, b in zip(first.frames, second.frames))
+
+
+def test_single_event_is_one_frame():
+    """A lone event is flushed after the batch window as a one-element array"""
+    async def run():
+        manager = ConnectionManager()
+        socket = FakeSocket()
+        await manager.connect(7, socket)
+        manager.publish(7, {"type": "player_joined", "game_id": 7})
+        await _settle(manager)
+        await manager.shutdown()
+        return socket
+
+    socket = asyncio.run(run())
+    assert [orjson.loads(frame) for frame in socket.frames] == [[{"type": "player_joined", "game_id": 7}]]
+
+
+def test_failed_subscriber_is_dropped():
+    """A socket whose send fails is unsubscribed while the others keep receiving"""
+    async def run():
+        manager = ConnectionManager()
+        good, bad = FakeSocket(), FakeSocket(fail=True)
+        await manager.connect(3, good)
+        await manager.connect(3, bad)
+
+        manager.publish(3, {"type": "move", "n": 1})
+        await _settle(manager)
+        subscribers = set(manager.connections[3])
+        manager.publish(3, {"type": "move", "n": 2})
+        await _settle(manager)
+        await manager.shutdown()
+        return good, subscribers
+
+    good, subscribers = asyncio.run(run())
+    assert subscribers == {good}
+    assert [orjson.loads(frame) for frame in good.frames] == [[{"type": "move", "n": 1}], [{"type": "move", "n": 2}]]
+
+
+def test_events_without_subscribers_are_dropped():
+    """Publishing to a game nobody watches is a no-op"""
+    manager = ConnectionManager()
+    manager.publish(99, {"type": "move"})
+    assert 99 not in manager.queues
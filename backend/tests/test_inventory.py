@@ -0,0 +1,146 @@
+"""
+Tests for inventory piece bookkeeping (id index and swap-remove)
+"""
+
+import itertools
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.routes import inventory
+
+app = FastAPI()
+app.include_router(inventory.router, prefix="/api/inventory")
+client = TestClient(app)
+
+_owners = itertools.count()
+
+
+def _new_owner() -> str:
+    """Fresh owner address, so tests never share an inventory"""
+    return f"0xtest{next(_owners)}"
+
+
+def _save(owner: str, name: str) -> int:
+    response = client.post(f"/api/inventory/{owner}/save-piece", json={"name": name, "captures_made": 1})
+    assert response.status_code == 200
+    return response.json()["data"]["piece"]["id"]
+
+
+def _assert_index_consistent(owner: str):
+    """The id index maps every piece to its slot and nothing else"""
+    inv = inventory.inventory_db[owner]
+    assert inv._id_index == {piece.id: i for i, piece in enumerate(inv.pieces)}
+    assert inv.used_slots == len(inv.pieces)
+
+
+def test_delete_from_middle_keeps_remaining_pieces_reachable():
+    """After a swap-remove every remaining piece can still be looked up and mutated"""
+    owner = _new_owner()
+    ids = [_save(owner, f"piece{n}") for n in range(5)]
+    _assert_index_consistent(owner)
+
+    assert client.delete(f"/api/inventory/{owner}/piece/{ids[1]}").status_code == 200
+    _assert_index_consistent(owner)
+    assert client.get(f"/api/inventory/{owner}/piece/{ids[1]}").status_code == 404
+
+    remaining = [ids[0], ids[2], ids[3], ids[4]]
+    for n, piece_id in zip((0, 2, 3, 4), remaining):
+        piece = client.get(f"/api/inventory/{owner}/piece/{piece_id}").json()
+        assert piece["id"] == piece_id and piece["name"] == f"piece{n}"
+
+        response = client.post(f"/api/inventory/{owner}/rename-piece", params={"piece_id": piece_id, "new_name": f"renamed{n}"})
+        assert response.json()["data"] == {"old_name": f"piece{n}", "new_name": f"renamed{n}"}
+
+        assert client.post(f"/api/inventory/{owner}/lock-piece", params={"piece_id": piece_id}).status_code == 200
+        assert client.get(f"/api/inventory/{owner}/piece/{piece_id}").json()["is_locked"]
+        assert client.post(f"/api/inventory/{owner}/unlock-piece", params={"piece_id": piece_id}).status_code == 200
+
+        response = client.post(
+            f"/api/inventory/{owner}/deploy-piece",
+            params={"piece_id": piece_id, "game_id": 1},
+            json={"file": 0, "rank": 0},
+        )
+        assert response.status_code == 200
+        piece = client.get(f"/api/inventory/{owner}/piece/{piece_id}").json()
+        assert piece["name"] == f"renamed{n}" and not piece["is_available"] and not piece["is_locked"]
+
+    _assert_index_consistent(owner)
+
+
+def test_delete_first_and_last():
+    """Removing the last slot and the first slot both keep the index in sync"""
+    owner = _new_owner()
+    ids = [_save(owner, f"piece{n}") for n in range(3)]
+
+    assert client.delete(f"/api/inventory/{owner}/piece/{ids[2]}").status_code == 200
+    _assert_index_consistent(owner)
+    assert client.delete(f"/api/inventory/{owner}/piece/{ids[0]}").status_code == 200
+    _assert_index_consistent(owner)
+
+    pieces = client.get(f"/api/inventory/{owner}").json()["pieces"]
+    assert [piece["id"] for piece in pieces] == [ids[1]]
+
+    assert client.delete(f"/api/inventory/{owner}/piece/{ids[1]}").status_code == 200
+    _assert_index_consistent(owner)
+    assert client.get(f"/api/inventory/{owner}").json()["pieces"] == []
+
+
+def test_locked_piece_cannot_be_deleted():
+    """A rejected delete leaves the piece and the index untouched"""
+    owner = _new_owner()
+    piece_id = _save(owner, "keeper")
+    client.post(f"/api/inventory/{owner}/lock-piece", params={"piece_id": piece_id})
+
+    assert client.delete(f"/api/inventory/{owner}/piece/{piece_id}").status_code == 400
+    _assert_index_consistent(owner)
+    assert client.get(f"/api/inventory/{owner}/piece/{piece_id}").status_code == 200
+
+
+def test_mutations_invalidate_cached_responses():
+    """Lock, unlock, delete and save each bump the version and re-encode both cached responses"""
+    owner = _new_owner()
+    ids = [_save(owner, f"piece{n}") for n in range(2)]
+    inv = inventory.inventory_db[owner]
+
+    def fetch():
+        """Inventory and stats as served, after checking both caches hold the current version"""
+        pieces = client.get(f"/api/inventory/{owner}").json()["pieces"]
+        stats = client.get(f"/api/inventory/{owner}/stats").json()
+        assert inventory._inventory_cache[owner][0] == inv._version
+        assert inventory._stats_cache[owner][0] == inv._version
+        return pieces, stats
+
+    # Repeat reads of an unchanged inventory hit the cache
+    pieces, stats = fetch()
+    cached = inventory._inventory_cache[owner][1], inventory._stats_cache[owner][1]
+    assert fetch() == (pieces, stats)
+    assert (inventory._inventory_cache[owner][1], inventory._stats_cache[owner][1]) == cached
+
+    version = inv._version
+    client.post(f"/api/inventory/{owner}/lock-piece", params={"piece_id": ids[0]})
+    assert inv._version > version
+    version = inv._version
+    pieces, stats = fetch()
+    assert stats["locked_pieces"] == 1
+    assert [p["is_locked"] for p in pieces if p["id"] == ids[0]] == [True]
+
+    client.post(f"/api/inventory/{owner}/unlock-piece", params={"piece_id": ids[0]})
+    assert inv._version > version
+    version = inv._version
+    pieces, stats = fetch()
+    assert stats["locked_pieces"] == 0
+    assert not any(p["is_locked"] for p in pieces)
+
+    client.delete(f"/api/inventory/{owner}/piece/{ids[1]}")
+    assert inv._version > version
+    version = inv._version
+    pieces, stats = fetch()
+    assert [p["id"] for p in pieces] == [ids[0]]
+    assert stats["total_pieces"] == 1 and stats["total_captures"] == 1
+
+    new_id = _save(owner, "fresh")
+    assert inv._version > version
+    pieces, stats = fetch()
+    assert sorted(p["id"] for p in pieces) == sorted([ids[0], new_id])
+    assert stats["total_pieces"] == 2 and stats["available_slots"] == inv.max_slots - 2
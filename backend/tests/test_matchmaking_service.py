@@ -0,0 +1,103 @@
+"""
+Tests for MatchmakingService queueing, deadlines and bot fallback
+"""
+
+import asyncio
+import time
+
+from models.schemas import MatchmakingRequest
+from services.matchmaking_service import MatchmakingService
+
+
+def _service() -> MatchmakingService:
+    """Service with timings shrunk so deadlines fire within a test"""
+    service = MatchmakingService()
+    service.MAX_WAIT_EXPAND_TIME = 0.02
+    service.ELO_EXPAND_INTERVAL = 0.02
+    service.BOT_FALLBACK_WAIT = 0.05
+    return service
+
+
+async def _wait_for(predicate, timeout: float = 1.0):
+    """Yield to the matchmaking loop until predicate() holds"""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached in time"
+        await asyncio.sleep(0.005)
+
+
+def test_pairs_compatible_players():
+    """Two HUMAN players within the ELO range are matched with each other"""
+    async def run():
+        service = _service()
+        await service.start()
+        try:
+            await service.queue_player(MatchmakingRequest(player="0xa", player_elo=1200, preferred_opponent="HUMAN"))
+            await service.queue_player(MatchmakingRequest(player="0xb", player_elo=1300, preferred_opponent="HUMAN"))
+            await _wait_for(lambda: service.get_match_result("0xa") is not None)
+        finally:
+            await service.shutdown()
+        return service
+
+    service = asyncio.run(run())
+    a = service.get_match_result("0xa")
+    b = service.get_match_result("0xb")
+    assert a.game_id == b.game_id and len(service.active_games) == 1
+    assert (a.opponent, b.opponent) == ("0xb", "0xa")
+    assert not a.is_bot
+    assert (a.color, b.color) == ("BLACK", "WHITE")  # Higher ELO plays white
+    assert not service.player_lookup and not service.human_queue
+
+
+def test_cancelled_player_is_never_matched():
+    """Cancelling drops the player's bot timer and its pending deadlines never fire"""
+    async def run():
+        service = _service()
+        await service.start()
+        try:
+            await service.queue_player(MatchmakingRequest(player="0xa", preferred_opponent="ANY"))
+            player = service.player_lookup["0xa"]
+            assert await service.cancel_queue("0xa")
+            assert not await service.cancel_queue("0xa")
+
+            # Past the bot fallback and the first ELO expansion deadline
+            await asyncio.sleep(service.BOT_FALLBACK_WAIT + service.MAX_WAIT_EXPAND_TIME + 3 * service.ELO_EXPAND_INTERVAL)
+        finally:
+            await service.shutdown()
+        return service, player
+
+    service, player = asyncio.run(run())
+    assert player.bot_fallback.cancelled()
+    assert service.get_match_result("0xa") is None and not service.active_games
+    assert not service.any_queue and not service.player_lookup
+    assert not service._deadlines and not service._bot_fallbacks
+
+
+def test_any_player_gets_a_bot_after_waiting():
+    """An unmatched ANY player is handed a bot once the fallback wait passes"""
+    async def run():
+        service = _service()
+        await service.start()
+        try:
+            await service.queue_player(MatchmakingRequest(player="0xa", player_elo=1500, preferred_opponent="ANY"))
+            queued_at = time.monotonic()
+
+            # No human is available, but the bot only comes after the wait
+            await asyncio.sleep(0.01)
+            assert service.get_match_result("0xa") is None
+            assert (await service.get_queue_status("0xa")).is_queued
+
+            await _wait_for(lambda: service.get_match_result("0xa") is not None)
+            waited = time.monotonic() - queued_at
+        finally:
+            await service.shutdown()
+        return service, waited
+
+    service, waited = asyncio.run(run())
+    match = service.get_match_result("0xa")
+    assert waited >= service.BOT_FALLBACK_WAIT * 0.9
+    assert match.is_bot and match.color == "WHITE"
+    assert match.bot_level == service._find_bot_level(1500)
+    assert match.opponent == f"bot_{match.bot_level}"
+    assert match.opponent_elo == int(service.bot_elos[match.bot_level - 1])
+    assert not service.player_lookup and not service.any_queue
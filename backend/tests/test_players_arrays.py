@@ -0,0 +1,31 @@
+"""
+Tests for PlayerArrays ELO index maintenance
+"""
+
+import pytest
+
+from services.players_arrays import PlayerArrays, ELO_MAX
+
+
+def test_rejected_elo_leaves_index_unchanged():
+    """An out-of-range ELO raises without dropping the player from the index"""
+    players = PlayerArrays()
+    a = players.get_or_create("0xa")
+    b = players.get_or_create("0xb")
+    players.set_elo(b, 1500)
+
+    index_before = list(players.elo_index)
+    top_before = players.top(10).tolist()
+
+    with pytest.raises(ValueError):
+        players.set_elo(a, 2 ** 40)
+    with pytest.raises(ValueError):
+        players.set_elo(a, ELO_MAX + 1)
+
+    assert list(players.elo_index) == index_before
+    assert players.top(10).tolist() == top_before
+    assert int(players.elo_current[a]) == 1200
+
+    # The slot still accepts valid updates afterwards
+    players.set_elo(a, 1600)
+    assert players.top(10).tolist() == [a, b]
@@ -0,0 +1,76 @@
+"""
+Tests for StarknetService JSON-RPC batching
+"""
+
+import asyncio
+
+import httpx
+import orjson
+import pytest
+
+from services.starknet_service import StarknetService
+
+
+def _echo_block_number(request: httpx.Request) -> httpx.Response:
+    """Answer every call in a batch with its own id as the result"""
+    batch = orjson.loads(request.content)
+    return httpx.Response(200, json=[{"jsonrpc": "2.0", "id": p["id"], "result": p["id"]} for p in batch])
+
+
+def _service(handler) -> StarknetService:
+    service = StarknetService(contract_address="0x1")
+    service.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return service
+
+
+def test_concurrent_calls_share_one_post():
+    """Calls within the batch window go out as one POST and each gets its own result"""
+    posts = []
+
+    def handler(request):
+        posts.append(request)
+        return _echo_block_number(request)
+
+    async def run():
+        service = _service(handler)
+        results = await asyncio.gather(*(service._rpc("starknet_blockNumber", []) for _ in range(3)))
+        await service.close()
+        return results
+
+    results = asyncio.run(run())
+    assert len(posts) == 1
+    assert sorted(r.result for r in results) == [1, 2, 3]
+
+
+def test_cancelled_caller_does_not_fail_the_batch():
+    """Cancelling one caller leaves the others in its batch with their results"""
+    async def run():
+        service = _service(_echo_block_number)
+        first = asyncio.ensure_future(service._rpc("starknet_blockNumber", []))
+        second = asyncio.ensure_future(service._rpc("starknet_blockNumber", []))
+        await asyncio.sleep(0)
+        first.cancel()
+        result = await second
+        await service.close()
+        return first, result
+
+    first, result = asyncio.run(run())
+    assert first.cancelled()
+    assert result.error is None and result.result == 2
+
+
+@pytest.mark.parametrize("yields", [1, 2])
+def test_cancelled_flush_releases_waiting_callers(yields):
+    """Cancelling the flush task, before or after it starts, cancels its callers"""
+    async def run():
+        service = _service(_echo_block_number)
+        call = asyncio.ensure_future(service._rpc("starknet_blockNumber", []))
+        for _ in range(yields):
+            await asyncio.sleep(0)
+        service._batch_task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(call, 1.0)
+        assert service._batch_task is None and not service._pending
+        await service.close()
+
+    asyncio.run(run())